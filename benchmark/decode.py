@@ -0,0 +1,95 @@
+"""Rows per second of the repository row mappers.
+
+Run with ``python benchmark/decode.py``. The baseline is the mapper used
+before rows were read as positional tuples.
+"""
+
+import os
+import sqlite3
+import timeit
+from collections.abc import Callable
+from datetime import UTC, datetime
+from uuid import UUID, uuid4
+
+os.environ.setdefault("PROJECT_DATABASE_PATH", ":memory:")
+
+from e1004.changelog_api.model import Change, Version
+from e1004.changelog_api.repository import to_change, to_version
+
+ROWS = 500
+ROUNDS = 200
+
+
+def baseline_version(row: sqlite3.Row) -> Version:
+    return Version(
+        id=UUID(bytes=row["id"]),
+        number=f"{row['major']}.{row['minor']}.{row['patch']}",
+        project_id=UUID(row["project_id"]),
+        created_at=datetime.fromtimestamp(row["created_at"], UTC).date(),
+        released_at=(
+            datetime.fromtimestamp(row["released_at"], UTC).date()
+            if row["released_at"] is not None
+            else None
+        ),
+    )
+
+
+def baseline_change(row: sqlite3.Row) -> Change:
+    return Change(
+        id=UUID(bytes=row["id"]),
+        version_id=UUID(bytes=row["version_id"]),
+        kind=row["kind"],
+        body=row["body"],
+        author=row["author"],
+    )
+
+
+def create_database() -> sqlite3.Connection:
+    connection = sqlite3.connect(":memory:")
+    connection.executescript(
+        """CREATE TABLE version (id BLOB, project_id TEXT, major INTEGER,
+        minor INTEGER, patch INTEGER, created_at INTEGER, released_at INTEGER);
+        CREATE TABLE change (id BLOB, version_id BLOB, body TEXT, kind TEXT,
+        author TEXT);"""
+    )
+    project_id = str(uuid4())
+    day = 86400
+    connection.executemany(
+        "INSERT INTO version VALUES (?,?,?,?,?,?,?)",
+        [
+            (uuid4().bytes, project_id, 1, i, 0, 1_700_000_000 // day * day, None)
+            for i in range(ROWS)
+        ],
+    )
+    connection.executemany(
+        "INSERT INTO change VALUES (?,?,?,?,?)",
+        [(uuid4().bytes, uuid4().bytes, "body", "fixed", "Bob") for _ in range(ROWS)],
+    )
+    return connection
+
+
+def measure(
+    connection: sqlite3.Connection, name: str, query: str, mapper: Callable
+) -> None:
+    rows = connection.execute(query).fetchall()
+    seconds = min(
+        timeit.repeat(lambda: [mapper(r) for r in rows], number=ROUNDS, repeat=5)
+    )
+    print(f"{name:<20}{ROWS * ROUNDS / seconds:>14,.0f} rows/s")
+
+
+def main() -> None:
+    connection = create_database()
+    v = """SELECT id, project_id, major, minor, patch, created_at, released_at
+    FROM version"""
+    c = "SELECT id, version_id, body, kind, author FROM change"
+    connection.row_factory = sqlite3.Row
+    measure(connection, "version baseline", v, baseline_version)
+    measure(connection, "change baseline", c, baseline_change)
+    connection.row_factory = None
+    measure(connection, "version", v, to_version)
+    measure(connection, "change", c, to_change)
+
+
+if __name__ == "__main__":
+    main()
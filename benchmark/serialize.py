@@ -0,0 +1,61 @@
+"""Responses per second of the JSON provider for the list endpoints.
+
+Run with ``python benchmark/serialize.py``. The baseline is Flask's default
+provider with the ISO date default the app used before.
+"""
+
+import timeit
+from datetime import date, datetime
+from uuid import uuid4
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from e1004.changelog_api.json_provider import ChangelogJSONProvider
+from e1004.changelog_api.model import Change, Version
+
+ROUNDS = 200
+
+
+class BaselineProvider(DefaultJSONProvider):
+    @staticmethod
+    def default(obj: object) -> object:
+        """Write dates as ISO 8601 like the app did before."""
+        if isinstance(obj, datetime | date):
+            return obj.isoformat()
+        return DefaultJSONProvider.default(obj)
+
+
+def measure(app: Flask, name: str, provider: DefaultJSONProvider, body: dict) -> None:
+    with app.app_context():
+        seconds = min(
+            timeit.repeat(lambda: provider.response(body), number=ROUNDS, repeat=5)
+        )
+    print(f"{name:<24}{ROUNDS / seconds:>10,.0f} responses/s")
+
+
+def main() -> None:
+    app = Flask(__name__)
+    project_id = uuid4()
+    day = date(2024, 1, 2)
+    versions = {
+        "versions": [
+            Version(day, project_id, f"1.{i}.0", uuid4(), day) for i in range(50)
+        ],
+        "previous_token": None,
+        "next_token": "eyJ2ZXJzaW9uX251bWJlciI6ICIxLjAuMCJ9",
+    }
+    version_id = uuid4()
+    changes = {
+        "changes": [
+            Change(uuid4(), version_id, "Fixed a bug " * 5, "fixed", "Bob")
+            for _ in range(300)
+        ]
+    }
+    for name, body in (("versions", versions), ("changes", changes)):
+        measure(app, f"{name} baseline", BaselineProvider(app), body)
+        measure(app, name, ChangelogJSONProvider(app), body)
+
+
+if __name__ == "__main__":
+    main()
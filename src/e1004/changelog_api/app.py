@@ -1,21 +1,33 @@
-from datetime import date, datetime
+from uuid import UUID
 
-from flask import Flask
-from flask.json.provider import DefaultJSONProvider
+from flask import Flask, Response, request
 from realerikrani.project import register_project
 
+from e1004.changelog_api import auth, service
 from e1004.changelog_api.blueprint import version
+from e1004.changelog_api.cli import import_changelog
+from e1004.changelog_api.json_provider import ChangelogJSONProvider
 from e1004.changelog_api.ui import ui
 
 
+def forget_deleted(response: Response) -> Response:
+    if response.status_code != 200:
+        return response
+    if request.endpoint == "project.delete_project":
+        project_id = UUID(response.json["project"]["id"])  # type: ignore[index]
+        service.forget_project(project_id)
+        auth.forget_project_keys(project_id)
+    elif request.endpoint == "key.delete_key":
+        auth.forget_key(request.view_args["id"])  # type: ignore[index]
+    return response
+
+
 def create(*, app_prefix_enabled: bool = False) -> Flask:
     app = register_project(Flask("e1004.changelog_api"))
     app.register_blueprint(version, url_prefix="/versions")
     app.register_blueprint(ui, url_prefix="/")
-    app.json.default = (  # type: ignore[attr-defined]
-        lambda obj: obj.isoformat()
-        if isinstance(obj, datetime | date)
-        else DefaultJSONProvider.default(obj)
-    )
+    app.json = ChangelogJSONProvider(app)
+    app.after_request(forget_deleted)
+    app.cli.add_command(import_changelog)
     app.config["APP_PREFIX_ENABLED"] = app_prefix_enabled
     return app
@@ -0,0 +1,59 @@
+import os
+import time
+from uuid import UUID
+
+import jwt
+from flask import request
+from realerikrani.project import PublicKey, bearer_extractor
+
+from . import repository
+from .cache import LRUCache
+
+_TTL = float(os.environ.get("CHANGELOG_KEY_CACHE_TTL", "300"))
+
+# Authorization header -> verified key and the time the entry stops being valid
+verified_keys: LRUCache[str, tuple[PublicKey, float]] = LRUCache(
+    int(os.environ.get("CHANGELOG_KEY_CACHE_SIZE", "10000"))
+)
+
+
+def _valid_until(now: float, header: str) -> float:
+    # the signature is already verified, only the expiry is read here
+    claims = jwt.decode(header.split()[1], options={"verify_signature": False})
+    expires = claims.get("exp")
+    return now + _TTL if expires is None else min(now + _TTL, float(expires))
+
+
+def protect() -> PublicKey:
+    """Return the key of the request's bearer token like bearer_extractor.protect.
+
+    Verified tokens are remembered until the cache TTL or their exp claim
+    runs out, whichever is first. A remembered key is used only while it
+    still exists, so revoking a key takes effect on the next request in
+    every process.
+
+    Raises:
+      ErrorGroup: If the token is missing, invalid or its key is deleted.
+
+    """
+    header = request.headers.get("Authorization")
+    if header is None:
+        return bearer_extractor.protect()
+    now = time.time()
+    entry = verified_keys.get(header)
+    if entry is not None:
+        key, valid_until = entry
+        if now < valid_until and repository.key_exists(key.id):
+            return key
+        verified_keys.pop(header)
+    key = bearer_extractor.protect()
+    verified_keys.put(header, (key, _valid_until(now, header)))
+    return key
+
+
+def forget_key(key_id: UUID) -> None:
+    verified_keys.pop_matching_values(lambda entry: entry[0].id == key_id)
+
+
+def forget_project_keys(project_id: UUID) -> None:
+    verified_keys.pop_matching_values(lambda entry: entry[0].project_id == project_id)
@@ -1,24 +1,32 @@
+import io
 import logging
+from collections.abc import Callable, Iterable, Mapping
+from typing import TYPE_CHECKING, cast
 from uuid import UUID
 
-from flask import Blueprint, request
+from flask import Blueprint, Response, current_app, request
 from realerikrani.flaskapierr import Error, ErrorGroup
-from realerikrani.project import bearer_extractor
 
-from . import service
+from . import auth, conditional, service
 from .error import (
     ChangeAuthorInvalidError,
     ChangeBodyInvalidError,
     ChangeKindInvalidError,
     ChangeNotFoundError,
+    ChangesReadingTokenInvalidError,
     VersionCannotBeDeletedError,
     VersionCannotBeReleasedError,
     VersionNotFoundError,
     VersionNumberInvalidError,
+    VersionRangeInvalidError,
     VersionReleasedAtError,
     VersionReleasedError,
     VersionsReadingTokenInvalidError,
 )
+from .model import Change, ImportProgress, ProjectRevision, Version, VersionsPage
+
+if TYPE_CHECKING:
+    from .json_provider import ChangelogJSONProvider
 
 LOG = logging.getLogger(__package__)
 
@@ -36,7 +44,7 @@ def to_version_number(req: dict) -> str:
 
 @version.route("", methods=["POST"])
 def create_version():
-    key = bearer_extractor.protect()
+    key = auth.protect()
     number = to_version_number(dict(request.json))  # type: ignore[arg-type]
     try:
         version = service.create_version(number, key.project_id)
@@ -47,7 +55,7 @@ def create_version():
 
 @version.route("/<version_number>", methods=["DELETE"])
 def delete_version(version_number: str):
-    key = bearer_extractor.protect()
+    key = auth.protect()
     try:
         version = service.delete_version(version_number, key.project_id)
     except VersionNumberInvalidError as invalid:
@@ -70,7 +78,7 @@ def to_released_at(req: dict) -> str:
 
 @version.route("/<version_number>", methods=["PATCH"])
 def release_version(version_number: str):
-    key = bearer_extractor.protect()
+    key = auth.protect()
     released_at = to_released_at(dict(request.json))  # type: ignore[arg-type]
     try:
         version = service.release_version(version_number, key.project_id, released_at)
@@ -91,20 +99,85 @@ def release_version(version_number: str):
     return {"version": version}
 
 
+def to_released_between(
+    args: Mapping[str, str],
+) -> tuple[str | None, str | None] | None:
+    released_from = args.get("released_from")
+    released_to = args.get("released_to")
+    if released_from is None and released_to is None:
+        return None
+    return released_from, released_to
+
+
+def to_versions_reader(
+    include: str | None,
+) -> Callable[
+    [UUID, int, str | None, str | None, tuple[str | None, str | None] | None],
+    VersionsPage,
+]:
+    if include is None:
+        return service.read_versions
+    if include == "changes":
+        return service.read_versions_with_changes
+    if include == "change_counts":
+        return service.read_versions_with_change_counts
+    message = "include must be 'changes' or 'change_counts'"
+    raise ErrorGroup("400", [Error(message, "VALUE_INVALID")])
+
+
 @version.route("", methods=["GET"])
 def read_versions():
-    key = bearer_extractor.protect()
+    key = auth.protect()
+    revision = service.read_project_revision(key.project_id)
+    if (not_modified := conditional.not_modified(revision)) is not None:
+        return not_modified
     page_size = request.args.get("page_size", type=int, default=5)
     page_token = request.args.get("page_token", default=None)
+    version_range = request.args.get("range", default=None)
+    released_between = to_released_between(request.args)
+    read = to_versions_reader(request.args.get("include", default=None))
     try:
-        version_page = service.read_versions(key.project_id, page_size, page_token)
-    except VersionsReadingTokenInvalidError as e:
+        version_page = read(
+            key.project_id, page_size, page_token, version_range, released_between
+        )
+    except (
+        VersionRangeInvalidError,
+        VersionReleasedAtError,
+        VersionsReadingTokenInvalidError,
+    ) as e:
         raise ErrorGroup("400", [Error(e.message, e.code)]) from None
-    return {
-        "versions": version_page.versions,
-        "previous_token": version_page.prev_token,
-        "next_token": version_page.next_token,
-    }
+    return conditional.validated(
+        {
+            "versions": version_page.versions,
+            "previous_token": version_page.prev_token,
+            "next_token": version_page.next_token,
+        },
+        revision,
+    )
+
+
+@version.route("/latest", defaults={"released": False}, methods=["GET"])
+@version.route("/latest/released", defaults={"released": True}, methods=["GET"])
+def read_latest_version(released: bool):  # noqa: FBT001
+    key = auth.protect()
+    revision = service.read_project_revision(key.project_id)
+    if (not_modified := conditional.not_modified(revision)) is not None:
+        return not_modified
+    try:
+        version = service.read_latest_version(key.project_id, released=released)
+    except VersionNotFoundError as v:
+        raise ErrorGroup("404", [Error(v.message, v.code)]) from None
+    return conditional.validated({"version": version}, revision)
+
+
+@version.route("/analytics", methods=["GET"])
+def read_analytics():
+    key = auth.protect()
+    revision = service.read_project_revision(key.project_id)
+    if (not_modified := conditional.not_modified(revision)) is not None:
+        return not_modified
+    months = service.read_monthly_rollups(key.project_id)
+    return conditional.validated({"months": months}, revision)
 
 
 def to_kind(req: dict) -> str:
@@ -130,7 +203,7 @@ def to_author(req: dict) -> str:
 
 @version.route("/<version_number>/changes", methods=["POST"])
 def create_change(version_number: str):
-    key = bearer_extractor.protect()
+    key = auth.protect()
     payload = dict(request.json)  # type: ignore[arg-type]
     errors = []
     try:
@@ -161,14 +234,81 @@ def create_change(version_number: str):
         VersionNumberInvalidError,
         ChangeAuthorInvalidError,
         VersionNotFoundError,
+        VersionReleasedError,
     ) as e:
         raise ErrorGroup("400", [Error(e.message, e.code)]) from None
     return {"change": change}, 201
 
 
+_BULK_CHANGES_LIMIT = 1000
+
+
+def to_bulk_change(item: object) -> tuple[tuple[str, str, str] | None, list[Error]]:
+    if not isinstance(item, dict):
+        return None, [Error("change must be an object", "VALUE_INVALID")]
+    errors = []
+    values = []
+    for read, validate in (
+        (to_kind, service.validate_kind),
+        (to_body, service.validate_body),
+        (to_author, service.validate_author),
+    ):
+        try:
+            values.append(validate(read(item)))
+        except Error as e:
+            errors.append(e)
+        except (
+            ChangeKindInvalidError,
+            ChangeBodyInvalidError,
+            ChangeAuthorInvalidError,
+        ) as e:
+            errors.append(Error(e.message, e.code))
+    if errors:
+        return None, errors
+    kind, body, author = values
+    return (kind, body, author), []
+
+
+@version.route("/<version_number>/changes/bulk", methods=["POST"])
+def create_changes(version_number: str):
+    key = auth.protect()
+    payload = request.json
+    if not isinstance(payload, dict):
+        message = "request body must be an object with changes"
+        raise ErrorGroup("400", [Error(message, "VALUE_INVALID")])
+    items = payload.get("changes")
+    if items is None:
+        raise ErrorGroup("400", [Error("changes missing", "VALUE_MISSING")])
+    if not isinstance(items, list) or not 1 <= len(items) <= _BULK_CHANGES_LIMIT:
+        message = f"changes must be a list of 1-{_BULK_CHANGES_LIMIT} items"
+        raise ErrorGroup("400", [Error(message, "VALUE_INVALID")])
+
+    changes = []
+    errors: list[Error] = []
+    for index, item in enumerate(items):
+        change, item_errors = to_bulk_change(item)
+        if change is not None:
+            changes.append(change)
+        errors.extend(
+            Error(f"changes[{index}]: {e.message}", e.code) for e in item_errors
+        )
+    if errors:
+        raise ErrorGroup("400", errors)
+
+    try:
+        created = service.create_changes(version_number, key.project_id, changes)
+    except (
+        VersionNumberInvalidError,
+        VersionNotFoundError,
+        VersionReleasedError,
+    ) as e:
+        raise ErrorGroup("400", [Error(e.message, e.code)]) from None
+    return {"changes": created}, 201
+
+
 @version.route("/<version_number>/changes/<uuid:change_id>", methods=["DELETE"])
 def delete_change(version_number: str, change_id: UUID):
-    key = bearer_extractor.protect()
+    key = auth.protect()
     try:
         change = service.delete_change(version_number, change_id, key.project_id)
     except (VersionNumberInvalidError, VersionReleasedError) as v:
@@ -180,14 +320,73 @@ def delete_change(version_number: str, change_id: UUID):
 
 @version.route("/<version_number>/changes", methods=["GET"])
 def read_changes_for_version(version_number: str):
-    key = bearer_extractor.protect()
+    key = auth.protect()
+    revision = service.read_project_revision(key.project_id)
+    if (not_modified := conditional.not_modified(revision)) is not None:
+        return not_modified
     try:
-        changes = service.read_changes_for_version(version_number, key.project_id)
+        changes = service.read_changes_for_version(
+            version_number, key.project_id, revision
+        )
     except VersionNumberInvalidError as n:
         raise ErrorGroup("400", [Error(n.message, n.code)]) from None
     except VersionNotFoundError as v:
         raise ErrorGroup("404", [Error(v.message, v.code)]) from None
-    return {"changes": changes}
+    return conditional.validated({"changes": changes}, revision)
+
+
+_MULTI_GET_VERSIONS_LIMIT = 100
+
+
+@version.route("/changes", methods=["GET"])
+def read_changes_for_versions():
+    key = auth.protect()
+    numbers = request.args.getlist("version_number")
+    if not 1 <= len(numbers) <= _MULTI_GET_VERSIONS_LIMIT:
+        message = f"version_number must be given 1-{_MULTI_GET_VERSIONS_LIMIT} times"
+        raise ErrorGroup("400", [Error(message, "VALUE_INVALID")])
+    revision = service.read_project_revision(key.project_id)
+    if (not_modified := conditional.not_modified(revision)) is not None:
+        return not_modified
+    try:
+        changes = service.read_changes_for_versions(numbers, key.project_id)
+    except VersionNumberInvalidError as n:
+        raise ErrorGroup("400", [Error(n.message, n.code)]) from None
+    except VersionNotFoundError as v:
+        raise ErrorGroup("404", [Error(v.message, v.code)]) from None
+    return conditional.validated({"changes": changes}, revision)
+
+
+@version.route("/changes/search", methods=["GET"])
+def read_project_changes():
+    key = auth.protect()
+    kind = request.args.get("kind", default=None)
+    author = request.args.get("author", default=None)
+    if kind is None and author is None:
+        raise ErrorGroup("400", [Error("kind or author missing", "VALUE_MISSING")])
+    revision = service.read_project_revision(key.project_id)
+    if (not_modified := conditional.not_modified(revision)) is not None:
+        return not_modified
+    page_size = request.args.get("page_size", type=int, default=5)
+    page_token = request.args.get("page_token", default=None)
+    try:
+        change_page = service.read_project_changes(
+            key.project_id, page_size, page_token, kind, author
+        )
+    except (
+        ChangeAuthorInvalidError,
+        ChangeKindInvalidError,
+        ChangesReadingTokenInvalidError,
+    ) as e:
+        raise ErrorGroup("400", [Error(e.message, e.code)]) from None
+    return conditional.validated(
+        {
+            "changes": change_page.changes,
+            "previous_token": change_page.prev_token,
+            "next_token": change_page.next_token,
+        },
+        revision,
+    )
 
 
 def to_target_version_number(req: dict) -> str:
@@ -201,7 +400,7 @@ def to_target_version_number(req: dict) -> str:
 
 @version.route("/<version_number>/changes/<uuid:change_id>", methods=["PATCH"])
 def move_change_to_other_version(version_number: str, change_id: UUID):
-    key = bearer_extractor.protect()
+    key = auth.protect()
     payload = dict(request.json)  # type: ignore[arg-type]
     target_version_number = to_target_version_number(payload)
     try:
@@ -213,3 +412,79 @@ def move_change_to_other_version(version_number: str, change_id: UUID):
     except (VersionNotFoundError, ChangeNotFoundError) as nt:
         raise ErrorGroup("404", [Error(nt.message, nt.code)]) from None
     return {"change": change}
+
+
+@version.route("/import", methods=["POST"])
+def import_changelog():
+    key = auth.protect()
+    author = request.args.get("author", default="import")
+    lines = io.TextIOWrapper(request.stream, encoding="utf-8")
+    progress = ImportProgress(0, 0, 0, 0.0)
+    try:
+        for progress in service.import_changelog(key.project_id, lines, author):
+            LOG.info(
+                "Imported %d versions and %d changes into project %s, %.0f changes/s",
+                progress.versions,
+                progress.changes,
+                str(key.project_id),
+                progress.changes / max(progress.seconds, 1e-9),
+            )
+    except (
+        ChangeAuthorInvalidError,
+        ChangeBodyInvalidError,
+        VersionNumberInvalidError,
+        VersionReleasedAtError,
+    ) as e:
+        raise ErrorGroup("400", [Error(e.message, e.code)]) from None
+    except UnicodeDecodeError:
+        raise ErrorGroup(
+            "400", [Error("changelog must be UTF-8 text", "VALUE_INVALID")]
+        ) from None
+    return {"import": progress}, 201
+
+
+def to_ndjson(
+    versions: Iterable[tuple[Version, list[Change]]], revision: ProjectRevision
+) -> Response:
+    json = cast("ChangelogJSONProvider", current_app.json)
+    lines = (json.dumps_line({"version": v, "changes": c}) for v, c in versions)
+    response = current_app.response_class(lines, mimetype="application/x-ndjson")
+    return conditional.validated(response, revision)
+
+
+@version.route("/export", methods=["GET"])
+def export_changelog():
+    key = auth.protect()
+    revision = service.read_project_revision(key.project_id)
+    if (not_modified := conditional.not_modified(revision)) is not None:
+        return not_modified
+    return to_ndjson(service.export_changelog(key.project_id), revision)
+
+
+@version.route("/changes/range", methods=["GET"])
+def read_changes_between():
+    key = auth.protect()
+    after = request.args.get("from", default=None)
+    if after is None:
+        raise ErrorGroup("400", [Error("from missing", "VALUE_MISSING")])
+    through = request.args.get("to", default=None)
+    revision = service.read_project_revision(key.project_id)
+    if (not_modified := conditional.not_modified(revision)) is not None:
+        return not_modified
+    try:
+        versions = service.read_changes_between(key.project_id, after, through)
+    except VersionNumberInvalidError as n:
+        raise ErrorGroup("400", [Error(n.message, n.code)]) from None
+    return to_ndjson(versions, revision)
+
+
+@version.route("/changelog", methods=["GET"])
+def render_changelog():
+    key = auth.protect()
+    revision = service.read_project_revision(key.project_id)
+    if (not_modified := conditional.not_modified(revision)) is not None:
+        return not_modified
+    response = current_app.response_class(
+        service.render_changelog(key.project_id), mimetype="text/markdown"
+    )
+    return conditional.validated(response, revision)
@@ -0,0 +1,76 @@
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+
+
+class LRUCache[K: Hashable, V]:
+    """Thread-safe in-process cache evicting the least recently used entries.
+
+    Every entry has a weight, 1 unless ``weigh`` says otherwise, and the total
+    weight stays at or below ``maxsize``. An entry heavier than ``maxsize`` is
+    not stored.
+    """
+
+    def __init__(self, maxsize: int, weigh: Callable[[V], int] | None = None) -> None:
+        """Create an empty cache."""
+        self._maxsize = maxsize
+        self._weigh = weigh
+        self._entries: OrderedDict[K, tuple[V, int]] = OrderedDict()
+        self._weight = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: K) -> V | None:
+        """Return the value of key and mark it as recently used."""
+        with self._lock:
+            try:
+                value, _ = self._entries[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: K, value: V) -> None:
+        """Store value under key, evicting old entries to make room."""
+        weight = 1 if self._weigh is None else self._weigh(value)
+        if weight > self._maxsize:
+            return
+        with self._lock:
+            if (old := self._entries.pop(key, None)) is not None:
+                self._weight -= old[1]
+            self._entries[key] = (value, weight)
+            self._weight += weight
+            while self._weight > self._maxsize:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._weight -= evicted
+
+    def pop(self, key: K) -> None:
+        """Remove key if it is cached."""
+        with self._lock:
+            if (old := self._entries.pop(key, None)) is not None:
+                self._weight -= old[1]
+
+    def pop_matching(self, predicate: Callable[[K], bool]) -> None:
+        """Remove every entry whose key satisfies predicate."""
+        with self._lock:
+            for key in [k for k in self._entries if predicate(k)]:
+                self._weight -= self._entries.pop(key)[1]
+
+    def pop_matching_values(self, predicate: Callable[[V], bool]) -> None:
+        """Remove every entry whose value satisfies predicate."""
+        with self._lock:
+            for key in [k for k, (v, _) in self._entries.items() if predicate(v)]:
+                self._weight -= self._entries.pop(key)[1]
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+            self._weight = 0
+
+    def __len__(self) -> int:
+        """Return the number of entries."""
+        return len(self._entries)
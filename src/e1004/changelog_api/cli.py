@@ -0,0 +1,42 @@
+from io import TextIOWrapper
+from uuid import UUID
+
+import click
+
+from . import service
+from .error import (
+    ChangeAuthorInvalidError,
+    ChangeBodyInvalidError,
+    ProjectNotFoundError,
+    VersionNumberInvalidError,
+    VersionReleasedAtError,
+)
+
+
+@click.command("import-changelog")
+@click.argument("project_id", type=click.UUID)
+@click.argument("changelog", type=click.File(encoding="utf-8"))
+@click.option("--author", default="import", help="Author of the imported changes.")
+@click.option("--batch-rows", default=5000, help="Rows written per transaction.")
+def import_changelog(
+    project_id: UUID, changelog: TextIOWrapper, author: str, batch_rows: int
+) -> None:
+    """Import a Keep a Changelog markdown file into a project."""
+    try:
+        for progress in service.import_changelog(
+            project_id, changelog, author, batch_rows
+        ):
+            rate = progress.changes / max(progress.seconds, 1e-9)
+            click.echo(
+                f"{progress.versions} versions, {progress.changes} changes, "
+                f"{progress.skipped_versions} existing versions skipped, "
+                f"{progress.seconds:.1f}s, {rate:.0f} changes/s"
+            )
+    except (
+        ChangeAuthorInvalidError,
+        ChangeBodyInvalidError,
+        ProjectNotFoundError,
+        VersionNumberInvalidError,
+        VersionReleasedAtError,
+    ) as e:
+        raise click.ClickException(e.message) from None
@@ -0,0 +1,37 @@
+from hashlib import blake2b
+
+from flask import Response, current_app, make_response, request
+from flask.typing import ResponseReturnValue
+
+from .model import ProjectRevision
+
+
+def _etag(revision: ProjectRevision) -> str:
+    # the URL carries the query parameters and the host that pages link to
+    seed = f"{revision.project_id}:{revision.revision}:{request.url}"
+    return blake2b(seed.encode(), digest_size=16).hexdigest()
+
+
+def _add_validators(response: Response, revision: ProjectRevision) -> Response:
+    response.set_etag(_etag(revision))
+    if revision.updated_at is not None:
+        response.last_modified = revision.updated_at
+    response.cache_control.no_cache = True
+    return response
+
+
+def not_modified(revision: ProjectRevision) -> Response | None:
+    """Return a 304 response if the client already has this revision.
+
+    Only If-None-Match is honoured. Last-Modified has a resolution of one
+    second, so If-Modified-Since cannot tell apart writes made within the
+    second of the previous response.
+    """
+    if not request.if_none_match.contains_weak(_etag(revision)):
+        return None
+    return _add_validators(current_app.response_class(status=304), revision)
+
+
+def validated(rv: ResponseReturnValue, revision: ProjectRevision) -> Response:
+    """Make a response from a view return value and add the validators."""
+    return _add_validators(make_response(rv), revision)
@@ -16,10 +16,10 @@ CREATE TABLE IF NOT EXISTS version (
     UNIQUE(project_id, major, minor, patch)
 ) WITHOUT ROWID;
 
-CREATE INDEX idx_version_project_id_major_minor_patch_desc
+CREATE INDEX IF NOT EXISTS idx_version_project_id_major_minor_patch_desc
 ON version (project_id, major DESC, minor DESC, patch DESC);
 
-CREATE INDEX idx_version_project_id_major_minor_patch_asc
+CREATE INDEX IF NOT EXISTS idx_version_project_id_major_minor_patch_asc
 ON version (project_id, major ASC, minor ASC, patch ASC);
 
 CREATE TABLE IF NOT EXISTS change (
@@ -51,9 +51,366 @@ CREATE TABLE IF NOT EXISTS change (
     PRIMARY KEY(id) ON CONFLICT FAIL
 ) WITHOUT ROWID;
 
-CREATE INDEX idx_change_version_id_kind
+CREATE INDEX IF NOT EXISTS idx_change_version_id_kind
 ON change (version_id, kind);
 
-CREATE INDEX idx_change_id_version_id
+CREATE INDEX IF NOT EXISTS idx_change_id_version_id
 ON change (id, version_id);
 """
+
+# Each of major, minor and patch gets 21 bits of number_key. Versions with a
+# larger part would collide or sort wrongly, so the migration stops on them
+# and they have to be renumbered first.
+ADD_VERSION_NUMBER_KEY = """
+CREATE TEMP TABLE version_number_check (
+    part INTEGER CONSTRAINT "version number parts must be below 2097152"
+    CHECK (part < 2097152)
+);
+
+INSERT INTO version_number_check SELECT max(major, minor, patch) FROM version;
+
+DROP TABLE version_number_check;
+
+ALTER TABLE version ADD COLUMN number_key INTEGER NOT NULL DEFAULT 0;
+
+UPDATE version SET number_key = (major << 42) | (minor << 21) | patch;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_version_project_id_number_key
+ON version (project_id, number_key);
+
+DROP INDEX IF EXISTS idx_version_project_id_major_minor_patch_desc;
+
+DROP INDEX IF EXISTS idx_version_project_id_major_minor_patch_asc;
+"""
+
+# uuid_blob is registered on each connection by the repository
+STORE_IDS_AS_BLOBS = """
+CREATE TABLE version_blob (
+    project_id TEXT NOT NULL CHECK(
+        length("project_id") = 36
+    ),
+    major INTEGER NOT NULL,
+    minor INTEGER NOT NULL,
+    patch INTEGER NOT NULL,
+    id BLOB NOT NULL CHECK(
+        typeof("id") = 'blob' AND length("id") = 16
+    ),
+    created_at INTEGER NOT NULL,
+    released_at INTEGER,
+    number_key INTEGER NOT NULL,
+    FOREIGN KEY(project_id) REFERENCES project(id) ON DELETE CASCADE,
+    PRIMARY KEY(id) ON CONFLICT FAIL,
+    UNIQUE(project_id, major, minor, patch)
+) WITHOUT ROWID;
+
+CREATE TABLE change_blob (
+    id BLOB NOT NULL CHECK(
+        typeof("id") = 'blob' AND length("id") = 16
+    ),
+    version_id BLOB NOT NULL CHECK(
+        typeof("version_id") = 'blob' AND length("version_id") = 16
+    ),
+    body TEXT NOT NULL CHECK(
+        length("body") <= 1000
+        AND length("body") >= 1
+    ),
+    kind TEXT NOT NULL CHECK(
+        "kind" in (
+            "added",
+            "changed",
+            "deprecated",
+            "removed",
+            "fixed",
+            "security"
+        )
+    ),
+    author TEXT NOT NULL CHECK(
+        length("author") <= 30
+        AND length("author") >= 1
+    ),
+    FOREIGN KEY(version_id) REFERENCES version_blob(id) ON DELETE CASCADE,
+    PRIMARY KEY(id) ON CONFLICT FAIL
+) WITHOUT ROWID;
+
+INSERT INTO version_blob
+SELECT project_id, major, minor, patch, uuid_blob(id),
+created_at, released_at, number_key FROM version;
+
+INSERT INTO change_blob
+SELECT uuid_blob(id), uuid_blob(version_id), body, kind, author FROM change;
+
+DROP TABLE change;
+
+DROP TABLE version;
+
+ALTER TABLE version_blob RENAME TO version;
+
+ALTER TABLE change_blob RENAME TO change;
+
+CREATE UNIQUE INDEX idx_version_project_id_number_key
+ON version (project_id, number_key);
+
+CREATE INDEX idx_change_version_id_kind
+ON change (version_id, kind);
+"""
+
+ADD_PROJECT_REVISION = """
+CREATE TABLE IF NOT EXISTS project_revision (
+    project_id TEXT NOT NULL CHECK(
+        length("project_id") = 36
+    ),
+    revision INTEGER NOT NULL,
+    updated_at INTEGER NOT NULL,
+    FOREIGN KEY(project_id) REFERENCES project(id) ON DELETE CASCADE,
+    PRIMARY KEY(project_id)
+) WITHOUT ROWID;
+
+INSERT INTO project_revision(project_id, revision, updated_at)
+SELECT DISTINCT project_id, 1, CAST(strftime('%s', 'now') AS INTEGER) FROM version;
+
+CREATE TRIGGER IF NOT EXISTS trg_version_insert_revision
+AFTER INSERT ON version
+BEGIN
+    INSERT INTO project_revision(project_id, revision, updated_at)
+    VALUES (NEW.project_id, 1, CAST(strftime('%s', 'now') AS INTEGER))
+    ON CONFLICT(project_id) DO UPDATE
+    SET revision = revision + 1, updated_at = excluded.updated_at;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_version_update_revision
+AFTER UPDATE ON version
+BEGIN
+    UPDATE project_revision
+    SET revision = revision + 1, updated_at = CAST(strftime('%s', 'now') AS INTEGER)
+    WHERE project_id = NEW.project_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_version_delete_revision
+AFTER DELETE ON version
+BEGIN
+    UPDATE project_revision
+    SET revision = revision + 1, updated_at = CAST(strftime('%s', 'now') AS INTEGER)
+    WHERE project_id = OLD.project_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_change_insert_revision
+AFTER INSERT ON change
+BEGIN
+    UPDATE project_revision
+    SET revision = revision + 1, updated_at = CAST(strftime('%s', 'now') AS INTEGER)
+    WHERE project_id = (SELECT project_id FROM version WHERE id = NEW.version_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_change_update_revision
+AFTER UPDATE ON change
+BEGIN
+    UPDATE project_revision
+    SET revision = revision + 1, updated_at = CAST(strftime('%s', 'now') AS INTEGER)
+    WHERE project_id = (SELECT project_id FROM version WHERE id = NEW.version_id);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_change_delete_revision
+AFTER DELETE ON change
+BEGIN
+    UPDATE project_revision
+    SET revision = revision + 1, updated_at = CAST(strftime('%s', 'now') AS INTEGER)
+    WHERE project_id = (SELECT project_id FROM version WHERE id = OLD.version_id);
+END;
+"""
+
+ADD_VERSION_POINTER = """
+CREATE TABLE IF NOT EXISTS version_pointer (
+    project_id TEXT NOT NULL CHECK(
+        length("project_id") = 36
+    ),
+    latest_id BLOB,
+    latest_key INTEGER,
+    released_id BLOB,
+    released_key INTEGER,
+    FOREIGN KEY(project_id) REFERENCES project(id) ON DELETE CASCADE,
+    PRIMARY KEY(project_id)
+) WITHOUT ROWID;
+
+INSERT INTO version_pointer(project_id, latest_id, latest_key)
+SELECT project_id, id, MAX(number_key) FROM version GROUP BY project_id;
+
+UPDATE version_pointer SET (released_id, released_key) = (
+    SELECT id, number_key FROM version
+    WHERE project_id = version_pointer.project_id AND released_at IS NOT NULL
+    ORDER BY number_key DESC LIMIT 1
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_version_insert_pointer
+AFTER INSERT ON version
+BEGIN
+    INSERT INTO version_pointer(project_id, latest_id, latest_key)
+    VALUES (NEW.project_id, NEW.id, NEW.number_key)
+    ON CONFLICT(project_id) DO UPDATE
+    SET latest_id = excluded.latest_id, latest_key = excluded.latest_key
+    WHERE latest_key IS NULL OR latest_key < excluded.latest_key;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_version_release_pointer
+AFTER UPDATE OF released_at ON version
+WHEN NEW.released_at IS NOT NULL
+BEGIN
+    UPDATE version_pointer SET released_id = NEW.id, released_key = NEW.number_key
+    WHERE project_id = NEW.project_id
+    AND (released_key IS NULL OR released_key < NEW.number_key);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_version_delete_pointer
+AFTER DELETE ON version
+BEGIN
+    UPDATE version_pointer SET (latest_id, latest_key) = (
+        SELECT id, number_key FROM version WHERE project_id = OLD.project_id
+        ORDER BY number_key DESC LIMIT 1
+    ) WHERE project_id = OLD.project_id AND latest_id = OLD.id;
+    UPDATE version_pointer SET (released_id, released_key) = (
+        SELECT id, number_key FROM version
+        WHERE project_id = OLD.project_id AND released_at IS NOT NULL
+        ORDER BY number_key DESC LIMIT 1
+    ) WHERE project_id = OLD.project_id AND released_id = OLD.id;
+END;
+"""
+
+ADD_RELEASED_AT_INDEX = """
+CREATE INDEX IF NOT EXISTS idx_version_project_id_released_at
+ON version (project_id, released_at, number_key);
+"""
+
+# Months are 'YYYY-MM' of released_at. Changes count in the month their
+# version was released, changes of unreleased versions do not count yet.
+ADD_MONTHLY_ROLLUPS = """
+CREATE TABLE IF NOT EXISTS release_rollup (
+    project_id TEXT NOT NULL CHECK(
+        length("project_id") = 36
+    ),
+    month TEXT NOT NULL,
+    releases INTEGER NOT NULL,
+    FOREIGN KEY(project_id) REFERENCES project(id) ON DELETE CASCADE,
+    PRIMARY KEY(project_id, month)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS change_rollup (
+    project_id TEXT NOT NULL CHECK(
+        length("project_id") = 36
+    ),
+    month TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    changes INTEGER NOT NULL,
+    FOREIGN KEY(project_id) REFERENCES project(id) ON DELETE CASCADE,
+    PRIMARY KEY(project_id, month, kind)
+) WITHOUT ROWID;
+
+INSERT INTO release_rollup(project_id, month, releases)
+SELECT project_id, strftime('%Y-%m', released_at, 'unixepoch'), COUNT(*)
+FROM version WHERE released_at IS NOT NULL GROUP BY 1, 2;
+
+INSERT INTO change_rollup(project_id, month, kind, changes)
+SELECT v.project_id, strftime('%Y-%m', v.released_at, 'unixepoch'), c.kind, COUNT(*)
+FROM version AS v JOIN change AS c ON c.version_id = v.id
+WHERE v.released_at IS NOT NULL GROUP BY 1, 2, 3;
+
+CREATE TRIGGER IF NOT EXISTS trg_version_release_rollup
+AFTER UPDATE OF released_at ON version
+WHEN OLD.released_at IS NOT NEW.released_at
+BEGIN
+    UPDATE release_rollup SET releases = releases - 1
+    WHERE project_id = OLD.project_id
+    AND month = strftime('%Y-%m', OLD.released_at, 'unixepoch');
+    UPDATE change_rollup SET changes = changes - (
+        SELECT COUNT(*) FROM change
+        WHERE version_id = OLD.id AND kind = change_rollup.kind
+    ) WHERE project_id = OLD.project_id
+    AND month = strftime('%Y-%m', OLD.released_at, 'unixepoch');
+    INSERT INTO release_rollup(project_id, month, releases)
+    SELECT NEW.project_id, strftime('%Y-%m', NEW.released_at, 'unixepoch'), 1
+    WHERE NEW.released_at IS NOT NULL
+    ON CONFLICT(project_id, month) DO UPDATE SET releases = releases + 1;
+    INSERT INTO change_rollup(project_id, month, kind, changes)
+    SELECT NEW.project_id, strftime('%Y-%m', NEW.released_at, 'unixepoch'),
+    kind, COUNT(*) FROM change
+    WHERE version_id = NEW.id AND NEW.released_at IS NOT NULL GROUP BY kind
+    ON CONFLICT(project_id, month, kind)
+    DO UPDATE SET changes = changes + excluded.changes;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_version_delete_rollup
+BEFORE DELETE ON version
+WHEN OLD.released_at IS NOT NULL
+BEGIN
+    UPDATE release_rollup SET releases = releases - 1
+    WHERE project_id = OLD.project_id
+    AND month = strftime('%Y-%m', OLD.released_at, 'unixepoch');
+    UPDATE change_rollup SET changes = changes - (
+        SELECT COUNT(*) FROM change
+        WHERE version_id = OLD.id AND kind = change_rollup.kind
+    ) WHERE project_id = OLD.project_id
+    AND month = strftime('%Y-%m', OLD.released_at, 'unixepoch');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_change_insert_rollup
+AFTER INSERT ON change
+BEGIN
+    INSERT INTO change_rollup(project_id, month, kind, changes)
+    SELECT project_id, strftime('%Y-%m', released_at, 'unixepoch'), NEW.kind, 1
+    FROM version WHERE id = NEW.version_id AND released_at IS NOT NULL
+    ON CONFLICT(project_id, month, kind) DO UPDATE SET changes = changes + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_change_update_rollup
+AFTER UPDATE OF version_id, kind ON change
+BEGIN
+    UPDATE change_rollup SET changes = changes - 1
+    WHERE (project_id, month, kind) = (
+        SELECT project_id, strftime('%Y-%m', released_at, 'unixepoch'), OLD.kind
+        FROM version WHERE id = OLD.version_id AND released_at IS NOT NULL
+    );
+    INSERT INTO change_rollup(project_id, month, kind, changes)
+    SELECT project_id, strftime('%Y-%m', released_at, 'unixepoch'), NEW.kind, 1
+    FROM version WHERE id = NEW.version_id AND released_at IS NOT NULL
+    ON CONFLICT(project_id, month, kind) DO UPDATE SET changes = changes + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_change_delete_rollup
+AFTER DELETE ON change
+BEGIN
+    UPDATE change_rollup SET changes = changes - 1
+    WHERE (project_id, month, kind) = (
+        SELECT project_id, strftime('%Y-%m', released_at, 'unixepoch'), OLD.kind
+        FROM version WHERE id = OLD.version_id AND released_at IS NOT NULL
+    );
+END;
+"""
+
+# A copy of the project and number key of the version of each change lets
+# changes be listed across versions by kind or author with an index range
+# scan. The repository sets both whenever it writes version_id.
+ADD_CHANGE_PROJECT = """
+ALTER TABLE change ADD COLUMN project_id TEXT;
+
+ALTER TABLE change ADD COLUMN number_key INTEGER;
+
+UPDATE change SET (project_id, number_key) = (
+    SELECT project_id, number_key FROM version WHERE id = change.version_id
+);
+
+CREATE INDEX IF NOT EXISTS idx_change_project_id_kind
+ON change (project_id, kind, number_key);
+
+CREATE INDEX IF NOT EXISTS idx_change_project_id_author
+ON change (project_id, author, number_key);
+"""
+
+# Applied in order on top of CREATE_TABLES, the position of each script is
+# its PRAGMA user_version. Append new scripts, never edit released ones.
+MIGRATIONS = (
+    ADD_VERSION_NUMBER_KEY,
+    STORE_IDS_AS_BLOBS,
+    ADD_PROJECT_REVISION,
+    ADD_VERSION_POINTER,
+    ADD_RELEASED_AT_INDEX,
+    ADD_MONTHLY_ROLLUPS,
+    ADD_CHANGE_PROJECT,
+)
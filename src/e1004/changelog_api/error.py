@@ -57,6 +57,21 @@ class VersionsReadingTokenInvalidError(Exception):
     code: str = "VALUE_INVALID"
 
 
+@dataclass(slots=True)
+class ChangesReadingTokenInvalidError(Exception):
+    message: str = "changes reading token invalid"
+    code: str = "VALUE_INVALID"
+
+
+@dataclass(slots=True)
+class VersionRangeInvalidError(Exception):
+    message: str = (
+        "version range must be comma separated comparisons like "
+        '">=1.4.0,<2.0.0" or "2.x" that some version can satisfy'
+    )
+    code: str = "VALUE_INVALID"
+
+
 @dataclass(slots=True)
 class ChangeKindInvalidError(Exception):
     message: str = (
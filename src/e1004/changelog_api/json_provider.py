@@ -0,0 +1,131 @@
+import json
+from collections.abc import Callable
+from dataclasses import fields, is_dataclass
+from datetime import date, datetime
+from json.encoder import encode_basestring, encode_basestring_ascii
+from operator import attrgetter
+from typing import TYPE_CHECKING, Any
+from uuid import UUID
+
+from flask.json.provider import DefaultJSONProvider
+
+if TYPE_CHECKING:
+    from flask.sansio.app import App
+    from werkzeug.sansio.response import Response
+
+_Layout = list[tuple[str, Callable[[Any], Any]]]
+
+
+def _default(obj: Any) -> Any:  # noqa: ANN401
+    if isinstance(obj, datetime | date):
+        return obj.isoformat()
+    return DefaultJSONProvider.default(obj)
+
+
+class ChangelogJSONProvider(DefaultJSONProvider):
+    """JSON provider that writes the model dataclasses without dict copies.
+
+    Compact responses are encoded by walking the payload once. Dataclasses use
+    a field layout computed on first use, with the key prefixes already
+    escaped, instead of the dataclasses.asdict copy of the default provider.
+    UUIDs become strings and dates ISO 8601 strings. Values the walk does not
+    know go through json.dumps with the same defaults as ``dumps``.
+    """
+
+    default = staticmethod(_default)
+
+    def __init__(self, app: "App") -> None:
+        """Create the provider for app."""
+        super().__init__(app)
+        self._layouts: dict[type, _Layout] = {}
+
+    def _layout(self, cls: type) -> _Layout:
+        if (layout := self._layouts.get(cls)) is None:
+            escape = self._escape
+            names = [f.name for f in fields(cls)]
+            if self.sort_keys:
+                names.sort()
+            layout = [
+                (("{" if i == 0 else ",") + escape(name) + ":", attrgetter(name))
+                for i, name in enumerate(names)
+            ]
+            self._layouts[cls] = layout
+        return layout
+
+    @property
+    def _escape(self) -> Callable[[str], str]:
+        return encode_basestring_ascii if self.ensure_ascii else encode_basestring
+
+    def _encode(self, obj: Any, parts: list[str]) -> None:  # noqa: ANN401, C901, PLR0912
+        cls = type(obj)
+        if cls is str:
+            parts.append(self._escape(obj))
+        elif obj is None:
+            parts.append("null")
+        elif obj is True:
+            parts.append("true")
+        elif obj is False:
+            parts.append("false")
+        elif cls is int:
+            parts.append(int.__repr__(obj))
+        elif cls is UUID:
+            parts.append(f'"{obj}"')
+        elif cls is date or cls is datetime:
+            parts.append(f'"{obj.isoformat()}"')
+        elif cls is list or cls is tuple:
+            if not obj:
+                parts.append("[]")
+                return
+            separator = "["
+            for item in obj:
+                parts.append(separator)
+                self._encode(item, parts)
+                separator = ","
+            parts.append("]")
+        elif cls is dict and all(type(k) is str for k in obj):
+            if not obj:
+                parts.append("{}")
+                return
+            separator = "{"
+            for key in sorted(obj) if self.sort_keys else obj:
+                parts.append(separator)
+                parts.append(self._escape(key))
+                parts.append(":")
+                self._encode(obj[key], parts)
+                separator = ","
+            parts.append("}")
+        elif is_dataclass(obj) and not isinstance(obj, type):
+            layout = self._layout(cls)
+            if not layout:
+                parts.append("{}")
+                return
+            for prefix, get in layout:
+                parts.append(prefix)
+                self._encode(get(obj), parts)
+            parts.append("}")
+        else:
+            parts.append(
+                json.dumps(
+                    obj,
+                    default=self.default,
+                    ensure_ascii=self.ensure_ascii,
+                    sort_keys=self.sort_keys,
+                    separators=(",", ":"),
+                )
+            )
+
+    def dumps_line(self, obj: Any) -> str:  # noqa: ANN401
+        """Serialize obj compactly as one line of newline-delimited JSON."""
+        parts: list[str] = []
+        self._encode(obj, parts)
+        parts.append("\n")
+        return "".join(parts)
+
+    def response(self, *args: Any, **kwargs: Any) -> "Response":  # noqa: ANN401
+        """Serialize the arguments like the default provider does."""
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            return super().response(*args, **kwargs)
+        parts: list[str] = []
+        self._encode(self._prepare_response_obj(args, kwargs), parts)
+        parts.append("\n")
+        return self._app.response_class("".join(parts), mimetype=self.mimetype)
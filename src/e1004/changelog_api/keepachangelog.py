@@ -0,0 +1,94 @@
+import re
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from datetime import date
+
+KINDS = ("added", "changed", "deprecated", "removed", "fixed", "security")
+
+HEADER = "# Changelog\n"
+
+# The number is taken whole, so "1.0.0-rc.1" or "0.9.0.1" fail validation of
+# the import instead of being read as another version.
+_VERSION_HEADING = re.compile(
+    r"^##\s+\[?v?(?P<number>\d[^\]\s]*)\]?"
+    r"(?:\s+-\s+(?P<date>\S+))?(?:\s+\[YANKED\])?\s*$"
+)
+_HEADING = re.compile(r"^(?P<level>#{1,3})\s+(?P<title>.*)$")
+_ITEM = re.compile(r"^ {0,3}[-*+]\s+(?P<body>.*)$")
+
+
+@dataclass(slots=True)
+class ParsedVersion:
+    number: str
+    released_at: str | None
+    changes: list[tuple[str, str]] = field(default_factory=list)
+
+
+def _to_version(line: str) -> ParsedVersion | None:
+    if (heading := _VERSION_HEADING.match(line)) is None:
+        return None
+    return ParsedVersion(heading["number"], heading["date"])
+
+
+def parse(lines: Iterable[str]) -> Iterator[ParsedVersion]:
+    """Parse a Keep a Changelog document line by line.
+
+    Versions are yielded as soon as their section ends, so only one version
+    is held in memory. ``## [x.y.z] - YYYY-MM-DD`` starts a version and gives
+    its number and release date, both unvalidated. ``### Added`` and the other
+    kind headings start the changes of that kind, and an indented line
+    continues the change above it. The Unreleased section, other headings and
+    link definitions are skipped.
+
+    Yields:
+      The versions in document order with their changes as kind and body.
+
+    """
+    version: ParsedVersion | None = None
+    kind: str | None = None
+    body: list[str] = []
+    for raw_line in lines:
+        line = raw_line.rstrip()
+        if body and line[:1].isspace() and not _ITEM.match(line):
+            body.append(line.strip())
+            continue
+        if body and version is not None and kind is not None:
+            version.changes.append((kind, " ".join(body)))
+        body = []
+        if (heading := _HEADING.match(line)) is None:
+            if kind is not None and (item := _ITEM.match(line)) is not None:
+                body = [item["body"].strip()]
+        elif len(heading["level"]) == 3:
+            title = heading["title"].strip().lower()
+            kind = title if version is not None and title in KINDS else None
+        else:
+            if version is not None:
+                yield version
+            version, kind = _to_version(line), None
+    if body and version is not None and kind is not None:
+        version.changes.append((kind, " ".join(body)))
+    if version is not None:
+        yield version
+
+
+def render_version(
+    number: str, released_at: date | None, changes: Iterable[tuple[str, str]]
+) -> str:
+    """Render one version section that parse reads back.
+
+    The changes, given as kind and body, are grouped under the kind headings
+    in KINDS order and keep their order within a kind. Lines after the first
+    of a body are indented. An unreleased version gets no date.
+    """
+    by_kind: dict[str, list[str]] = {kind: [] for kind in KINDS}
+    for kind, body in changes:
+        by_kind[kind].append("- " + "\n  ".join(body.splitlines()) + "\n")
+    heading = f"\n## [{number}]"
+    if released_at is not None:
+        heading += f" - {released_at.isoformat()}"
+    parts = [heading, "\n"]
+    for kind, items in by_kind.items():
+        if items:
+            parts.append(f"\n### {kind.capitalize()}\n\n")
+            parts.extend(items)
+    return "".join(parts)
@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from datetime import date
+from datetime import date, datetime
 from typing import Literal
 from uuid import UUID
 
@@ -20,6 +20,19 @@ class VersionsPage:
     next_token: str | None
 
 
+@dataclass(slots=True)
+class VersionRange:
+    lowest: int
+    highest: int
+
+
+@dataclass(slots=True)
+class VersionsWindow:
+    versions: list[Version]
+    has_previous: bool
+    has_next: bool
+
+
 @dataclass(slots=True)
 class Change:
     id: UUID
@@ -27,3 +40,54 @@ class Change:
     body: str
     kind: Literal["added", "changed", "deprecated", "removed", "fixed", "security"]
     author: str
+
+
+@dataclass(slots=True)
+class ProjectChange(Change):
+    version_number: str
+
+
+@dataclass(slots=True)
+class ChangesPage:
+    changes: list[ProjectChange]
+    prev_token: str | None
+    next_token: str | None
+
+
+@dataclass(slots=True)
+class ChangesWindow:
+    changes: list[ProjectChange]
+    has_previous: bool
+    has_next: bool
+
+
+@dataclass(slots=True)
+class VersionWithChanges(Version):
+    changes: list[Change]
+
+
+@dataclass(slots=True)
+class VersionWithChangeCounts(Version):
+    change_counts: dict[str, int]
+
+
+@dataclass(slots=True)
+class ProjectRevision:
+    project_id: UUID
+    revision: int
+    updated_at: datetime | None
+
+
+@dataclass(slots=True)
+class ImportProgress:
+    versions: int
+    changes: int
+    skipped_versions: int
+    seconds: float
+
+
+@dataclass(slots=True)
+class MonthlyRollup:
+    month: str
+    releases: int
+    changes: dict[str, int]
@@ -0,0 +1,234 @@
+import queue
+import sqlite3
+import threading
+import time
+from collections.abc import Callable, Iterator, Mapping, Sequence
+from contextlib import closing, contextmanager
+from dataclasses import dataclass
+from typing import Any, TypeVar
+
+R = TypeVar("R")
+
+
+@dataclass(slots=True)
+class PoolExhaustedError(Exception):
+    message: str = "no database connection available"
+    code: str = "POOL_EXHAUSTED"
+
+
+@dataclass(slots=True)
+class _Entry:
+    connection: sqlite3.Connection
+    checked_at: float
+
+
+def _statements(script: str) -> Iterator[str]:
+    statement = ""
+    for line in script.splitlines(keepends=True):
+        statement += line
+        if sqlite3.complete_statement(statement):
+            yield statement
+            statement = ""
+
+
+class ConnectionPool:
+    """Long-lived SQLite connections shared by the worker threads.
+
+    Connections are created lazily up to ``size`` and returned to the pool
+    after each use, so the connect and pragma cost is paid once per connection
+    and the statement cache of the connection stays warm. The most recently
+    returned connection is handed out first. A connection idle for longer than
+    ``health_check_interval`` seconds is probed before reuse and replaced if
+    the probe fails.
+
+    The first connection creates ``schema`` in an empty database and then
+    applies the ``migrations`` that are newer than the ``user_version`` of the
+    database, all in one transaction. The single-argument ``functions`` are
+    registered on every connection, so migrations and queries can call them.
+
+    Connections run in autocommit mode and every transaction is started
+    explicitly. While a thread is inside ``transaction``, its queries join that
+    transaction instead of checking out a connection of their own.
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        schema: str,
+        db_name: str,
+        pragmas: list[str],
+        *,
+        migrations: Sequence[str] = (),
+        functions: Mapping[str, Callable[[Any], Any]] | None = None,
+        size: int = 5,
+        timeout: float = 5.0,
+        health_check_interval: float = 30.0,
+        cached_statements: int = 256,
+    ) -> None:
+        """Configure the pool without opening any connection yet."""
+        self._schema = schema
+        self._db_name = db_name
+        self._pragmas = pragmas
+        self._migrations = migrations
+        self._functions = functions or {}
+        self._size = size
+        self._timeout = timeout
+        self._health_check_interval = health_check_interval
+        self._cached_statements = cached_statements
+        self._idle: queue.LifoQueue[_Entry] = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._schema_ready = False
+        self._local = threading.local()
+
+    @property
+    def size(self) -> int:
+        """Maximum number of open connections."""
+        return self._size
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(
+            self._db_name,
+            uri=True,
+            check_same_thread=False,
+            cached_statements=self._cached_statements,
+            isolation_level=None,
+        )
+        for pragma in self._pragmas:
+            connection.execute(pragma)
+        for name, function in self._functions.items():
+            connection.create_function(name, 1, function, deterministic=True)
+        with self._lock:
+            if not self._schema_ready:
+                self._migrate(connection)
+                self._schema_ready = True
+        return connection
+
+    def _migrate(self, connection: sqlite3.Connection) -> None:
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            version = connection.execute("PRAGMA user_version").fetchone()[0]
+            scripts = [self._schema] if version == 0 else []
+            scripts.extend(self._migrations[version:])
+            for script in scripts:
+                for statement in _statements(script):
+                    connection.execute(statement)
+            latest = max(version, len(self._migrations))
+            connection.execute(f"PRAGMA user_version = {latest}")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    def _is_healthy(self, entry: _Entry) -> bool:
+        if time.monotonic() - entry.checked_at < self._health_check_interval:
+            return True
+        try:
+            entry.connection.execute("SELECT 1").fetchone()
+        except sqlite3.Error:
+            return False
+        return True
+
+    def _discard(self, connection: sqlite3.Connection) -> None:
+        with self._lock:
+            self._created -= 1
+        connection.close()
+
+    def _checkout(self) -> sqlite3.Connection:
+        while True:
+            try:
+                entry = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if self._is_healthy(entry):
+                return entry.connection
+            self._discard(entry.connection)
+
+        with self._lock:
+            can_create = self._created < self._size
+            if can_create:
+                self._created += 1
+        if can_create:
+            try:
+                return self._connect()
+            except BaseException:
+                with self._lock:
+                    self._created -= 1
+                raise
+
+        try:
+            entry = self._idle.get(timeout=self._timeout)
+        except queue.Empty:
+            raise PoolExhaustedError from None
+        if self._is_healthy(entry):
+            return entry.connection
+        self._discard(entry.connection)
+        return self._checkout()
+
+    def _return(self, connection: sqlite3.Connection) -> None:
+        if connection.in_transaction:
+            connection.execute("ROLLBACK")
+        self._idle.put(_Entry(connection, time.monotonic()))
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Check out a connection and return it to the pool afterwards.
+
+        Raises:
+            PoolExhaustedError: no connection was returned in time
+
+        """
+        connection = self._checkout()
+        try:
+            yield connection
+        except sqlite3.DatabaseError as err:
+            if not isinstance(err, sqlite3.IntegrityError | sqlite3.OperationalError):
+                self._discard(connection)
+                raise
+            self._return(connection)
+            raise
+        except BaseException:
+            self._return(connection)
+            raise
+        self._return(connection)
+
+    @contextmanager
+    def transaction(self, *, write: bool = False) -> Iterator[sqlite3.Connection]:
+        """Run the enclosed queries of this thread in one transaction.
+
+        A write transaction takes the database write lock up front, so checks
+        made inside it still hold when the following statements modify data.
+        A nested call joins the transaction that is already open.
+
+        Raises:
+            PoolExhaustedError: no connection was returned in time
+
+        """
+        if (current := getattr(self._local, "connection", None)) is not None:
+            yield current
+            return
+        with self.connection() as connection:
+            connection.execute("BEGIN IMMEDIATE" if write else "BEGIN")
+            self._local.connection = connection
+            try:
+                yield connection
+            except BaseException:
+                if connection.in_transaction:
+                    connection.execute("ROLLBACK")
+                raise
+            finally:
+                self._local.connection = None
+            connection.execute("COMMIT")
+
+    def query(self, executor: Callable[[sqlite3.Cursor], R]) -> R:
+        """Run executor with a cursor inside a transaction."""
+        with self.transaction() as connection, closing(connection.cursor()) as cursor:
+            return executor(cursor)
+
+    def close(self) -> None:
+        """Close the idle connections."""
+        while True:
+            try:
+                entry = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._discard(entry.connection)
@@ -1,12 +1,14 @@
 import os
 import sqlite3
+from collections.abc import Iterator
+from contextlib import contextmanager
 from datetime import UTC, date, datetime
-from functools import partial
-from uuid import UUID, uuid4
+from functools import lru_cache
+from itertools import groupby
+from typing import Literal
+from uuid import UUID, SafeUUID, uuid4
 
-from realerikrani.sopenqlite import query
-
-from .db import CREATE_TABLES
+from .db import CREATE_TABLES, MIGRATIONS
 from .error import (
     ChangeNotFoundError,
     ProjectNotFoundError,
@@ -16,52 +18,121 @@ from .error import (
     VersionNotFoundError,
     VersionReleasedError,
 )
-from .model import Change, Version
+from .model import (
+    Change,
+    ChangesWindow,
+    MonthlyRollup,
+    ProjectChange,
+    ProjectRevision,
+    Version,
+    VersionRange,
+    VersionsWindow,
+)
+from .pool import ConnectionPool
 
-_query = partial(
-    query,
+_pool = ConnectionPool(
     CREATE_TABLES,
     os.environ["PROJECT_DATABASE_PATH"],
     ["PRAGMA foreign_keys = 1"],
+    migrations=MIGRATIONS,
+    functions={"uuid_blob": lambda value: UUID(value).bytes},
+    size=int(os.environ.get("PROJECT_DATABASE_POOL_SIZE", "5")),
 )
+_query = _pool.query
+
+
+@contextmanager
+def unit_of_work(*, write: bool = False) -> Iterator[None]:
+    """Run all repository calls of the block on one connection and snapshot.
+
+    With write, the write lock is taken when the block starts.
+    """
+    with _pool.transaction(write=write):
+        yield
+
+
+def to_number_key(version_number: str) -> int:
+    """Pack a version number into an integer that sorts like the version.
+
+    Each of major, minor and patch takes 21 bits, which
+    service.validate_version_number guarantees.
+    """
+    major, minor, patch = map(int, version_number.split("."))
+    return (major << 42) | (minor << 21) | patch
+
+
+_MAX_NUMBER_KEY = to_number_key("2097151.2097151.2097151")
+_NUMBER_PART_MASK = (1 << 21) - 1
+
+
+def _to_version_number(number_key: int) -> str:
+    major, minor = number_key >> 42, (number_key >> 21) & _NUMBER_PART_MASK
+    return f"{major}.{minor}.{number_key & _NUMBER_PART_MASK}"
+
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+@lru_cache(maxsize=4096)
+def _to_date(timestamp: int) -> date:
+    # versions are stamped at midnight UTC, so a few thousand dates cover them
+    return date.fromordinal(_EPOCH_ORDINAL + timestamp // 86400)
+
 
+@lru_cache(maxsize=1024)
+def _to_project_id(value: str) -> UUID:
+    return UUID(value)
 
-def to_version(row: sqlite3.Row | None) -> Version:
+
+def _to_timestamp(day: date) -> float:
+    return datetime.combine(day, datetime.min.time(), UTC).timestamp()
+
+
+def _to_uuid(value: bytes) -> UUID:
+    # skips the argument checks of UUID(bytes=...), the column holds 16 bytes
+    uuid = object.__new__(UUID)
+    object.__setattr__(uuid, "int", int.from_bytes(value))
+    object.__setattr__(uuid, "is_safe", SafeUUID.unknown)
+    return uuid
+
+
+def to_version(row: tuple | None) -> Version:
+    """Map id, project_id, major, minor, patch, created_at, released_at."""
     if row is None:
         raise VersionNotFoundError
-    number = f"{row['major']}.{row['minor']}.{row['patch']}"
+    released_at = row[6]
     return Version(
-        id=UUID(row["id"]),
-        number=number,
-        project_id=UUID(row["project_id"]),
-        created_at=datetime.fromtimestamp(row["created_at"], UTC).date(),
-        released_at=(
-            datetime.fromtimestamp(row["released_at"], UTC).date()
-            if row["released_at"] is not None
-            else None
-        ),
+        created_at=_to_date(int(row[5])),
+        project_id=_to_project_id(row[1]),
+        number=f"{row[2]}.{row[3]}.{row[4]}",
+        id=_to_uuid(row[0]),
+        released_at=None if released_at is None else _to_date(int(released_at)),
     )
 
 
-def to_change(row: sqlite3.Row | None) -> Change:
+def to_change(row: tuple | None) -> Change:
+    """Map id, version_id, body, kind, author."""
     if row is None:
         raise ChangeNotFoundError
-    return Change(
-        id=UUID(row["id"]),
-        version_id=UUID(row["version_id"]),
-        kind=row["kind"],
-        body=row["body"],
-        author=row["author"],
-    )
+    return Change(_to_uuid(row[0]), _to_uuid(row[1]), row[2], row[3], row[4])
 
 
 def create_version(version_number: str, project_id: UUID) -> Version:
-    q = """INSERT INTO version(project_id, major, minor, patch, id, created_at)
-    VALUES (?,?,?,?,?,?) RETURNING *"""
+    q = """INSERT INTO version(
+    project_id, major, minor, patch, id, created_at, number_key
+    ) VALUES (?,?,?,?,?,?,?)
+    RETURNING id, project_id, major, minor, patch, created_at, released_at"""
     time = (
         datetime.now(UTC).replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
     )
-    args = str(project_id), *map(int, version_number.split(".")), str(uuid4()), time
+    number_key = to_number_key(version_number)
+    args = (
+        str(project_id),
+        *map(int, version_number.split(".")),
+        uuid4().bytes,
+        time,
+        number_key,
+    )
 
     try:
         return to_version(_query(lambda c: c.execute(q, args).fetchone()))
@@ -73,8 +144,60 @@ def create_version(version_number: str, project_id: UUID) -> Version:
         raise
 
 
+def import_versions(
+    project_id: UUID,
+    versions: list[tuple[str, date | None, list[tuple[str, str, str]]]],
+) -> tuple[int, int]:
+    """Create released versions with their changes in one transaction.
+
+    Versions that already exist are skipped together with their changes.
+    """
+    qv = """INSERT INTO version(
+    project_id, major, minor, patch, id, created_at, number_key
+    ) VALUES (?,?,?,?,?,?,?) ON CONFLICT DO NOTHING RETURNING id"""
+    qc = """INSERT INTO change(
+    id, version_id, body, kind, author, project_id, number_key
+    ) VALUES (?,?,?,?,?,?,?)"""
+    qr = "UPDATE version SET released_at=? WHERE id=?"
+    time = (
+        datetime.now(UTC).replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
+    )
+
+    def insert(c: sqlite3.Cursor) -> tuple[int, int]:
+        created = changed = 0
+        for number, released_at, changes in versions:
+            args = (
+                str(project_id),
+                *map(int, number.split(".")),
+                uuid4().bytes,
+                time,
+                to_number_key(number),
+            )
+            if (row := c.execute(qv, args).fetchone()) is None:
+                continue
+            rows = [
+                (uuid4().bytes, row[0], b, k, a, args[0], args[-1])
+                for k, b, a in changes
+            ]
+            c.executemany(qc, rows)
+            if released_at is not None:
+                released = datetime.combine(released_at, datetime.min.time(), UTC)
+                c.execute(qr, (released.timestamp(), row[0]))
+            created += 1
+            changed += len(rows)
+        return created, changed
+
+    try:
+        with unit_of_work(write=True):
+            return _query(insert)
+    except sqlite3.IntegrityError as integrity:
+        if integrity.sqlite_errorname == "SQLITE_CONSTRAINT_FOREIGNKEY":
+            raise ProjectNotFoundError from None
+        raise
+
+
 def delete_version(version_number: str, project_id: UUID) -> Version:
-    check_query = """SELECT * FROM version WHERE project_id = ?
+    check_query = """SELECT 1 FROM version WHERE project_id = ?
     AND major = ? AND minor = ? AND patch = ? AND released_at IS NOT NULL"""
     check_args = (str(project_id), *map(int, version_number.split(".")))
 
@@ -82,7 +205,8 @@ def delete_version(version_number: str, project_id: UUID) -> Version:
         raise VersionCannotBeDeletedError from None
 
     delete_query = """DELETE FROM version WHERE project_id = ?
-    AND major = ? AND minor = ? AND patch = ? AND released_at IS NULL RETURNING *"""
+    AND major = ? AND minor = ? AND patch = ? AND released_at IS NULL
+    RETURNING id, project_id, major, minor, patch, created_at, released_at"""
 
     return to_version(_query(lambda c: c.execute(delete_query, check_args).fetchone()))
 
@@ -90,7 +214,7 @@ def delete_version(version_number: str, project_id: UUID) -> Version:
 def release_version(
     version_number: str, project_id: UUID, released_at: date
 ) -> Version:
-    check_query = """SELECT * FROM version WHERE project_id = ?
+    check_query = """SELECT 1 FROM version WHERE project_id = ?
     AND major = ? AND minor = ? AND patch = ? AND released_at IS NOT NULL"""
     check_args = (str(project_id), *map(int, version_number.split(".")))
 
@@ -98,7 +222,8 @@ def release_version(
         raise VersionCannotBeReleasedError from None
 
     update_query = """UPDATE version SET released_at = ? WHERE project_id = ?
-    AND major = ? AND minor = ? AND patch = ? AND released_at IS NULL RETURNING *"""
+    AND major = ? AND minor = ? AND patch = ? AND released_at IS NULL
+    RETURNING id, project_id, major, minor, patch, created_at, released_at"""
     released_timestamp = datetime.combine(
         released_at, datetime.min.time(), UTC
     ).timestamp()
@@ -111,89 +236,187 @@ def release_version(
     )
 
 
-def read_versions(project_id: UUID, page_size: int) -> list[Version]:
-    q = """SELECT * FROM version WHERE project_id = ?
-    ORDER BY major DESC, minor DESC, patch DESC LIMIT ?"""
-    args = str(project_id), page_size
-    return [to_version(v) for v in _query(lambda c: c.execute(q, args).fetchall())]
-
-
-def read_prev_versions(
-    project_id: UUID, page_size: int, last_version: str
-) -> list[Version]:
-    q = """SELECT * FROM version WHERE project_id = :project_id AND(
-    (major=:major AND minor=:minor AND patch>:patch) OR
-    (major=:major AND minor>:minor) OR
-    (major>:major)
+_WINDOW_BOUNDS = {
+    "next": ("<", "DESC", ">=", "ASC"),
+    "previous": (">", "ASC", "<=", "DESC"),
+}
+
+
+def _read_rows_window(  # noqa: PLR0913
+    table: str,
+    columns: str,
+    where: str,
+    sort: tuple[str, ...],
+    params: dict[str, object],
+    cursor: tuple[object, ...] | None,
+    page_size: int,
+    direction: Literal["next", "previous"],
+) -> tuple[list[tuple], bool, bool]:
+    # sort holds the columns the rows are ordered by, descending
+    # returns the rows of the page, has_previous and has_next
+    newest_first = ", ".join(f"{c} DESC" for c in sort)
+    params["limit"] = page_size + 1
+    if cursor is None:
+        q = f"""SELECT {columns} FROM {table} WHERE {where}
+        ORDER BY {newest_first} LIMIT :limit"""  # noqa: S608
+        rows = _query(lambda c: c.execute(q, params).fetchall())
+        return rows[:page_size], False, len(rows) > page_size
+
+    ahead, ahead_order, behind, behind_order = _WINDOW_BOUNDS[direction]
+    keys = ", ".join(sort)
+    named_keys = ", ".join(f"{c} AS sort_{i}" for i, c in enumerate(sort))
+    at = ", ".join(f":cursor_{i}" for i in range(len(sort)))
+    ahead_sort = ", ".join(f"{c} {ahead_order}" for c in sort)
+    behind_sort = ", ".join(f"{c} {behind_order}" for c in sort)
+    named_newest_first = ", ".join(f"sort_{i} DESC" for i in range(len(sort)))
+    q = f"""SELECT * FROM (
+    SELECT {columns}, {named_keys}, 0 AS behind FROM {table}
+    WHERE {where} AND ({keys}) {ahead} ({at})
+    ORDER BY {ahead_sort} LIMIT :limit
+    ) UNION ALL SELECT * FROM (
+    SELECT {columns}, {named_keys}, 1 AS behind FROM {table}
+    WHERE {where} AND ({keys}) {behind} ({at})
+    ORDER BY {behind_sort} LIMIT 1
+    ) ORDER BY {named_newest_first}"""  # noqa: S608
+    params.update({f"cursor_{i}": value for i, value in enumerate(cursor)})
+    rows = _query(lambda c: c.execute(q, params).fetchall())
+    page = [r for r in rows if not r[-1]]
+    has_more = len(page) > page_size
+    if has_more:
+        del page[-1 if direction == "next" else 0]
+    has_behind = len(page) + has_more < len(rows)
+    if direction == "next":
+        return page, has_behind, has_more
+    return page, has_more, has_behind
+
+
+def _read_window(  # noqa: PLR0913
+    where: str,
+    sort: tuple[str, ...],
+    params: dict[str, object],
+    cursor: tuple[object, ...] | None,
+    page_size: int,
+    direction: Literal["next", "previous"],
+) -> VersionsWindow:
+    columns = "id, project_id, major, minor, patch, created_at, released_at"
+    rows, has_previous, has_next = _read_rows_window(
+        "version", columns, where, sort, params, cursor, page_size, direction
     )
-    ORDER BY major ASC, minor ASC, patch ASC LIMIT :limit"""
-    major, minor, patch = map(int, last_version.split("."))
-    params = {
+    return VersionsWindow([to_version(r) for r in rows], has_previous, has_next)
+
+
+def read_versions_window(
+    project_id: UUID,
+    page_size: int,
+    cursor: str | None,
+    direction: Literal["next", "previous"],
+    version_range: VersionRange | None = None,
+) -> VersionsWindow:
+    """Read one page of versions, newest first, with one statement.
+
+    One extra version on each side tells whether more pages exist.
+    """
+    where = """project_id = :project_id
+    AND number_key BETWEEN :lowest AND :highest"""
+    params: dict[str, object] = {
         "project_id": str(project_id),
-        "major": major,
-        "minor": minor,
-        "patch": patch,
-        "limit": page_size,
+        "lowest": 0 if version_range is None else version_range.lowest,
+        "highest": _MAX_NUMBER_KEY if version_range is None else version_range.highest,
     }
-    return [to_version(v) for v in _query(lambda c: c.execute(q, params).fetchall())][
-        ::-1
-    ]
-
-
-def read_next_versions(
-    project_id: UUID, page_size: int, last_version: str
-) -> list[Version]:
-    q = """SELECT * FROM version WHERE project_id = :project_id AND(
-    (major=:major AND minor=:minor AND patch<:patch) OR
-    (major=:major AND minor<:minor) OR
-    (major<:major)
-    )
-    ORDER BY major DESC, minor DESC, patch DESC LIMIT :limit"""
-    major, minor, patch = map(int, last_version.split("."))
-    params = {
+    at = None if cursor is None else (to_number_key(cursor),)
+    return _read_window(where, ("number_key",), params, at, page_size, direction)
+
+
+def read_release_window(  # noqa: PLR0913
+    project_id: UUID,
+    page_size: int,
+    cursor: tuple[date, str] | None,
+    direction: Literal["next", "previous"],
+    released_between: tuple[date, date],
+    version_range: VersionRange | None = None,
+) -> VersionsWindow:
+    """Like read_versions_window, last released first, then newest number."""
+    where = """project_id = :project_id
+    AND released_at BETWEEN :released_from AND :released_to
+    AND number_key BETWEEN :lowest AND :highest"""
+    params: dict[str, object] = {
         "project_id": str(project_id),
-        "major": major,
-        "minor": minor,
-        "patch": patch,
-        "limit": page_size,
+        "released_from": _to_timestamp(released_between[0]),
+        "released_to": _to_timestamp(released_between[1]),
+        "lowest": 0 if version_range is None else version_range.lowest,
+        "highest": _MAX_NUMBER_KEY if version_range is None else version_range.highest,
     }
-    return [to_version(v) for v in _query(lambda c: c.execute(q, params).fetchall())]
+    at = None
+    if cursor is not None:
+        at = (_to_timestamp(cursor[0]), to_number_key(cursor[1]))
+    return _read_window(
+        where, ("released_at", "number_key"), params, at, page_size, direction
+    )
 
 
 def create_change(
     version_number: str, project_id: UUID, kind: str, body: str, author: str
 ) -> Change:
-    q = """INSERT INTO change(id, version_id, body, kind, author)
-    SELECT :change_id, id, :body, :kind, :author FROM version
-    WHERE project_id=:project_id AND major=:major AND minor=:minor AND patch=:patch
-    RETURNING *"""
-    major, minor, patch = map(int, version_number.split("."))
+    """Create a change for an unreleased version."""
+    q = """INSERT INTO change(
+    id, version_id, body, kind, author, project_id, number_key
+    ) SELECT :change_id, id, :body, :kind, :author, project_id, number_key FROM version
+    WHERE project_id=:project_id AND number_key=:number_key AND released_at IS NULL
+    RETURNING id, version_id, body, kind, author"""
+    qv = "SELECT 1 FROM version WHERE project_id=:project_id AND number_key=:number_key"
     args = {
-        "change_id": str(uuid4()),
+        "change_id": uuid4().bytes,
         "body": body,
         "kind": kind,
         "project_id": str(project_id),
         "author": author,
-        "major": major,
-        "minor": minor,
-        "patch": patch,
+        "number_key": to_number_key(version_number),
     }
 
-    try:
-        return to_change(_query(lambda c: c.execute(q, args).fetchone()))
-    except ChangeNotFoundError:
-        raise VersionNotFoundError from None
+    def insert(c: sqlite3.Cursor) -> tuple:
+        row: tuple | None = c.execute(q, args).fetchone()
+        if row is not None:
+            return row
+        if c.execute(qv, args).fetchone() is None:
+            raise VersionNotFoundError
+        raise VersionReleasedError
+
+    return to_change(_query(insert))
+
+
+def create_changes(
+    version_number: str, project_id: UUID, changes: list[tuple[str, str, str]]
+) -> list[Change]:
+    """Create changes for one unreleased version in one transaction."""
+    qv = "SELECT id, released_at FROM version WHERE project_id=? AND number_key=?"
+    qc = """INSERT INTO change(
+    id, version_id, body, kind, author, project_id, number_key
+    ) VALUES (?,?,?,?,?,?,?)"""
+    args_v = str(project_id), to_number_key(version_number)
+
+    def insert(c: sqlite3.Cursor) -> list[tuple]:
+        if (version := c.execute(qv, args_v).fetchone()) is None:
+            raise VersionNotFoundError
+        if version[1] is not None:
+            raise VersionReleasedError
+        rows = [(uuid4().bytes, version[0], b, k, a, *args_v) for k, b, a in changes]
+        c.executemany(qc, rows)
+        return rows
+
+    with unit_of_work(write=True):
+        return [to_change(row) for row in _query(insert)]
 
 
 def delete_change(version_number: str, id: UUID, project_id: UUID) -> Change:
-    qv = "SELECT * FROM version WHERE project_id=? AND major=? AND minor=? AND patch=?"
+    qv = """SELECT id, project_id, major, minor, patch, created_at, released_at
+    FROM version WHERE project_id=? AND major=? AND minor=? AND patch=?"""
     qc = """DELETE FROM change
     WHERE id=? AND version_id=(
     SELECT id FROM version
     WHERE project_id=? AND major=? AND minor=? AND patch=? AND released_at is NULL
-    ) RETURNING *"""
+    ) RETURNING id, version_id, body, kind, author"""
     args_v = str(project_id), *map(int, version_number.split("."))
-    args_c = str(id), str(project_id), *map(int, version_number.split("."))
+    args_c = id.bytes, str(project_id), *map(int, version_number.split("."))
     _qv = lambda c: c.execute(qv, args_v).fetchone()
     _qc = lambda c: c.execute(qc, args_c).fetchone()
     version, change = _query(lambda c: (_qv(c), _qc(c)))
@@ -203,40 +426,199 @@ def delete_change(version_number: str, id: UUID, project_id: UUID) -> Change:
     return to_change(change)
 
 
-def read_changes_for_version(version_number: str, project_id: UUID) -> list[Change]:
-    version_query = """SELECT id FROM version WHERE project_id = ?
-                       AND major = ? AND minor = ? AND patch = ?"""
-    version_args = (str(project_id), *map(int, version_number.split(".")))
-    version_id_row = _query(lambda c: c.execute(version_query, version_args).fetchone())
-    if version_id_row is None:
+def read_version(version_number: str, project_id: UUID) -> Version:
+    q = """SELECT id, project_id, major, minor, patch, created_at, released_at
+    FROM version WHERE project_id=? AND major=? AND minor=? AND patch=?"""
+    args = str(project_id), *map(int, version_number.split("."))
+    return to_version(_query(lambda c: c.execute(q, args).fetchone()))
+
+
+def read_latest_version(project_id: UUID, *, released: bool = False) -> Version:
+    """Read the newest, or newest released, version from its version pointer."""
+    column = "released_id" if released else "latest_id"
+    q = f"""SELECT v.id, v.project_id, v.major, v.minor, v.patch, v.created_at,
+    v.released_at FROM version_pointer AS p JOIN version AS v ON v.id = p.{column}
+    WHERE p.project_id = ?"""  # noqa: S608
+    return to_version(_query(lambda c: c.execute(q, (str(project_id),)).fetchone()))
+
+
+def read_changes(version_id: UUID) -> list[Change]:
+    q = """SELECT id, version_id, body, kind, author FROM change
+    WHERE version_id=? ORDER BY kind ASC"""
+    args = (version_id.bytes,)
+    return [to_change(r) for r in _query(lambda c: c.execute(q, args).fetchall())]
+
+
+def iter_version_batches(
+    project_id: UUID, batch_size: int = 100
+) -> Iterator[list[Version]]:
+    """Yield every version of the project, newest first, in batches.
+
+    Every batch is read with its own statement, continuing along the
+    number_key index after the last version of the previous batch.
+    """
+    first = """SELECT id, project_id, major, minor, patch, created_at, released_at,
+    number_key FROM version WHERE project_id = :project_id
+    ORDER BY number_key DESC LIMIT :limit"""
+    following = """SELECT id, project_id, major, minor, patch, created_at, released_at,
+    number_key FROM version WHERE project_id = :project_id AND number_key < :key
+    ORDER BY number_key DESC LIMIT :limit"""
+    params: dict[str, object] = {"project_id": str(project_id), "limit": batch_size}
+
+    def read_batch(c: sqlite3.Cursor) -> list[tuple]:
+        return c.execute(following if "key" in params else first, params).fetchall()
+
+    while rows := _query(read_batch):
+        yield [to_version(r) for r in rows]
+        if len(rows) < batch_size:
+            return
+        params["key"] = rows[-1][7]
+
+
+def count_changes_of_versions(
+    version_ids: list[UUID],
+) -> dict[UUID, dict[str, int]]:
+    """Count the changes per kind of many versions from the kind index alone."""
+    if not version_ids:
+        return {}
+    q = f"""SELECT version_id, kind, COUNT(*) FROM change
+    WHERE version_id IN ({",".join("?" * len(version_ids))})
+    GROUP BY version_id, kind"""  # noqa: S608
+    args = [i.bytes for i in version_ids]
+    counts: dict[UUID, dict[str, int]] = {}
+    for version_id, kind, count in _query(lambda c: c.execute(q, args).fetchall()):
+        counts.setdefault(_to_uuid(version_id), {})[kind] = count
+    return counts
+
+
+def read_versions_by_number(
+    project_id: UUID, version_numbers: list[str]
+) -> list[Version]:
+    """Read many versions, newest first, with one statement."""
+    keys = {to_number_key(n) for n in version_numbers}
+    q = f"""SELECT id, project_id, major, minor, patch, created_at, released_at
+    FROM version WHERE project_id = ? AND number_key IN ({",".join("?" * len(keys))})
+    ORDER BY number_key DESC"""  # noqa: S608
+    args = (str(project_id), *keys)
+    rows = _query(lambda c: c.execute(q, args).fetchall())
+    if len(rows) < len(keys):
         raise VersionNotFoundError
-    version_id = version_id_row[0]
-    change_query = """SELECT * FROM change WHERE version_id=? ORDER BY kind ASC"""
-    change_args = (version_id,)
-    return [
-        to_change(h)
-        for h in _query(lambda c: c.execute(change_query, change_args).fetchall())
+    return [to_version(r) for r in rows]
+
+
+def read_changes_of_versions(version_ids: list[UUID]) -> dict[UUID, list[Change]]:
+    """Read the changes of many versions, ordered by kind, with one statement."""
+    if not version_ids:
+        return {}
+    q = f"""SELECT id, version_id, body, kind, author FROM change
+    WHERE version_id IN ({",".join("?" * len(version_ids))})
+    ORDER BY version_id, kind"""  # noqa: S608
+    args = [i.bytes for i in version_ids]
+    changes: dict[UUID, list[Change]] = {}
+    for row in _query(lambda c: c.execute(q, args).fetchall()):
+        change = to_change(row)
+        changes.setdefault(change.version_id, []).append(change)
+    return changes
+
+
+def read_changes_window(  # noqa: PLR0913
+    project_id: UUID,
+    page_size: int,
+    cursor: tuple[str, UUID] | None,
+    direction: Literal["next", "previous"],
+    kind: str | None = None,
+    author: str | None = None,
+) -> ChangesWindow:
+    """Read one page of changes, newest version first, then by change id."""
+    where = "project_id = :project_id"
+    params: dict[str, object] = {"project_id": str(project_id)}
+    if kind is not None:
+        where += " AND kind = :kind"
+        params["kind"] = kind
+    if author is not None:
+        where += " AND author = :author"
+        params["author"] = author
+    at = None
+    if cursor is not None:
+        at = (to_number_key(cursor[0]), cursor[1].bytes)
+    rows, has_previous, has_next = _read_rows_window(
+        "change",
+        "id, version_id, body, kind, author, number_key",
+        where,
+        ("number_key", "id"),
+        params,
+        at,
+        page_size,
+        direction,
+    )
+    changes = [
+        ProjectChange(
+            _to_uuid(r[0]), _to_uuid(r[1]), r[2], r[3], r[4], _to_version_number(r[5])
+        )
+        for r in rows
     ]
+    return ChangesWindow(changes, has_previous, has_next)
+
+
+def iter_versions_with_changes(
+    project_id: UUID,
+    batch_size: int = 100,
+    after: str | None = None,
+    through: str | None = None,
+) -> Iterator[tuple[Version, list[Change]]]:
+    """Yield the versions, newest first, with their changes, in batches.
+
+    A version created behind the cursor during the walk is missed.
+    """
+    q = """SELECT v.id, v.project_id, v.major, v.minor, v.patch, v.created_at,
+    v.released_at, v.number_key, c.id, c.version_id, c.body, c.kind, c.author
+    FROM (
+    SELECT * FROM version WHERE project_id = :project_id
+    AND number_key BETWEEN :lowest AND :highest
+    ORDER BY number_key DESC LIMIT :limit
+    ) AS v LEFT JOIN change AS c ON c.version_id = v.id
+    ORDER BY v.number_key DESC, c.kind ASC"""
+    params = {
+        "project_id": str(project_id),
+        "lowest": 0 if after is None else to_number_key(after) + 1,
+        "highest": _MAX_NUMBER_KEY if through is None else to_number_key(through),
+        "limit": batch_size,
+    }
+
+    def read_batch(c: sqlite3.Cursor) -> list[tuple]:
+        return c.execute(q, params).fetchall()
+
+    while True:
+        versions = 0
+        for key, group in groupby(_query(read_batch), key=lambda r: r[7]):
+            version_rows = list(group)
+            changes = [to_change(r[8:]) for r in version_rows if r[8] is not None]
+            yield to_version(version_rows[0]), changes
+            params["highest"] = key - 1
+            versions += 1
+        if versions < batch_size:
+            return
 
 
 def move_change_to_other_version(
     from_version_number: str, to_version_number: str, project_id: UUID, change_id: UUID
 ) -> Change:
-    qv = "SELECT * FROM version WHERE project_id=? AND major=? AND minor=? AND patch=?"
-    qc = """UPDATE change SET version_id=(
-    SELECT id FROM version WHERE project_id=:project_id AND
+    qv = """SELECT id, project_id, major, minor, patch, created_at, released_at
+    FROM version WHERE project_id=? AND major=? AND minor=? AND patch=?"""
+    qc = """UPDATE change SET (version_id, number_key)=(
+    SELECT id, number_key FROM version WHERE project_id=:project_id AND
     major=:to_major AND minor=:to_minor AND patch=:to_patch
     AND released_at is NULL)
     WHERE id=:change_id AND version_id=(
     SELECT id FROM version
     WHERE project_id=:project_id AND major=:from_major AND
     minor=:from_minor AND patch=:from_patch AND released_at is NULL
-    ) RETURNING *"""
+    ) RETURNING id, version_id, body, kind, author"""
     args_v1 = str(project_id), *map(int, from_version_number.split("."))
     args_v2 = str(project_id), *map(int, to_version_number.split("."))
     args_c = {
         "project_id": str(project_id),
-        "change_id": str(change_id),
+        "change_id": change_id.bytes,
         "to_major": args_v2[1],
         "to_minor": args_v2[2],
         "to_patch": args_v2[3],
@@ -255,3 +637,45 @@ def move_change_to_other_version(
     if fv.released_at:
         raise VersionReleasedError
     return to_change(change)
+
+
+def read_project_revision(project_id: UUID) -> ProjectRevision:
+    """Read the counter that grows with every change to the project's data.
+
+    Triggers on version and change keep it current. A project without any
+    version has revision 0.
+    """
+    q = "SELECT revision, updated_at FROM project_revision WHERE project_id=?"
+    row = _query(lambda c: c.execute(q, (str(project_id),)).fetchone())
+    if row is None:
+        return ProjectRevision(project_id, 0, None)
+    return ProjectRevision(project_id, row[0], datetime.fromtimestamp(row[1], UTC))
+
+
+def read_monthly_rollups(project_id: UUID) -> list[MonthlyRollup]:
+    """Read releases and changes by kind per month, oldest first.
+
+    A change counts in the month its version was released.
+    """
+    qr = """SELECT month, releases FROM release_rollup
+    WHERE project_id = ? AND releases > 0"""
+    qc = """SELECT month, kind, changes FROM change_rollup
+    WHERE project_id = ? AND changes > 0"""
+    args = (str(project_id),)
+    releases, changes = _query(
+        lambda c: (c.execute(qr, args).fetchall(), c.execute(qc, args).fetchall())
+    )
+    months = {month: MonthlyRollup(month, count, {}) for month, count in releases}
+    for month, kind, count in changes:
+        months.setdefault(month, MonthlyRollup(month, 0, {})).changes[kind] = count
+    return [months[month] for month in sorted(months)]
+
+
+def key_exists(key_id: UUID) -> bool:
+    """Check that the public key has not been deleted.
+
+    The public_key table belongs to the project package and shares this
+    database.
+    """
+    q = "SELECT 1 FROM public_key WHERE id=?"
+    return _query(lambda c: c.execute(q, (str(key_id),)).fetchone()) is not None
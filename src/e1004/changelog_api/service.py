@@ -1,24 +1,70 @@
-import contextlib
+import os
+import time
+from collections.abc import Iterable, Iterator
+from dataclasses import replace
 from datetime import date
 from re import fullmatch
+from typing import Literal
 from uuid import UUID
 
 from realerikrani.base64token import decode, encode
+from realerikrani.project import project_repo
 
-from . import repository
+from . import keepachangelog, repository
+from .cache import LRUCache
 from .error import (
     ChangeAuthorInvalidError,
     ChangeBodyInvalidError,
     ChangeKindInvalidError,
+    ChangesReadingTokenInvalidError,
     VersionNumberInvalidError,
+    VersionRangeInvalidError,
     VersionReleasedAtError,
     VersionsReadingTokenInvalidError,
 )
-from .model import Change, Version, VersionsPage
+from .model import (
+    Change,
+    ChangesPage,
+    ImportProgress,
+    MonthlyRollup,
+    ProjectChange,
+    ProjectRevision,
+    Version,
+    VersionRange,
+    VersionsPage,
+    VersionsWindow,
+    VersionWithChangeCounts,
+    VersionWithChanges,
+)
+
+# Released versions cannot change, so their change lists are kept until the
+# version or its project is deleted. The size counts changes, not versions.
+released_changes: LRUCache[tuple[UUID, str], list[Change]] = LRUCache(
+    int(os.environ.get("CHANGELOG_RELEASED_CHANGES_CACHE_SIZE", "100000")),
+    weigh=lambda changes: len(changes) + 1,
+)
+
+# Rendered markdown sections of released versions, weighed in characters.
+released_sections: LRUCache[tuple[UUID, str], str] = LRUCache(
+    int(os.environ.get("CHANGELOG_RELEASED_SECTIONS_CACHE_SIZE", "10000000")),
+    weigh=len,
+)
+
+# Project names are shown on every public page. A name is kept for
+# CHANGELOG_PROJECT_NAME_CACHE_TTL seconds; unknown projects are not cached.
+project_names: LRUCache[UUID, tuple[str, float]] = LRUCache(
+    int(os.environ.get("CHANGELOG_PROJECT_NAME_CACHE_SIZE", "10000"))
+)
+_PROJECT_NAME_TTL = float(os.environ.get("CHANGELOG_PROJECT_NAME_CACHE_TTL", "60"))
+
+# major, minor and patch are packed into 21 bits each for sorting
+_VERSION_NUMBER_PART_LIMIT = 1 << 21
 
 
 def validate_version_number(number: str) -> str:
-    if fullmatch(r"^\d+\.\d+\.\d+$", number) is not None:
+    if fullmatch(r"^\d+\.\d+\.\d+$", number) is not None and all(
+        int(part) < _VERSION_NUMBER_PART_LIMIT for part in number.split(".")
+    ):
         return number
     raise VersionNumberInvalidError
 
@@ -30,6 +76,39 @@ def validate_released_at(released_at: str) -> date:
         raise VersionReleasedAtError from e
 
 
+_VERSION_RANGE_CLAUSE = r"(>=|<=|>|<|=)?\s*(\d+(?:\.\d+){0,2})((?:\.[xX*]){0,2})"
+
+
+def validate_version_range(expression: str) -> VersionRange:
+    """Compile a range like ">=1.4.0,<2.0.0" into inclusive number key bounds.
+
+    A partial number like "2.x" or "<=2.1" stands for all versions it starts.
+    """
+    lowest, highest = 0, _VERSION_NUMBER_PART_LIMIT**3 - 1
+    for clause in expression.split(","):
+        if (comparison := fullmatch(_VERSION_RANGE_CLAUSE, clause.strip())) is None:
+            raise VersionRangeInvalidError
+        operator, number, wildcards = comparison.groups()
+        parts = [int(part) for part in number.split(".")]
+        if len(parts) + wildcards.count(".") > 3 or any(
+            part >= _VERSION_NUMBER_PART_LIMIT for part in parts
+        ):
+            raise VersionRangeInvalidError
+        start = repository.to_number_key(".".join(map(str, [*parts, 0, 0][:3])))
+        end = start + _VERSION_NUMBER_PART_LIMIT ** (3 - len(parts))
+        if operator in (">=", "=", None):
+            lowest = max(lowest, start)
+        if operator in ("<=", "=", None):
+            highest = min(highest, end - 1)
+        if operator == ">":
+            lowest = max(lowest, end)
+        elif operator == "<":
+            highest = min(highest, start - 1)
+    if lowest > highest:
+        raise VersionRangeInvalidError
+    return VersionRange(lowest, highest)
+
+
 def create_version(version_number: str, project_id: UUID) -> Version:
     valid_number = validate_version_number(version_number)
     return repository.create_version(valid_number, project_id)
@@ -37,68 +116,217 @@ def create_version(version_number: str, project_id: UUID) -> Version:
 
 def delete_version(version_number: str, project_id: UUID) -> Version:
     valid_number = validate_version_number(version_number)
-    return repository.delete_version(valid_number, project_id)
+    with repository.unit_of_work(write=True):
+        version = repository.delete_version(valid_number, project_id)
+    _forget_version(project_id, valid_number)
+    return version
 
 
 def release_version(version_number: str, project_id: UUID, released_at: str) -> Version:
     valid_number = validate_version_number(version_number)
     valid_date = validate_released_at(released_at)
-    return repository.release_version(valid_number, project_id, valid_date)
+    with repository.unit_of_work(write=True):
+        return repository.release_version(valid_number, project_id, valid_date)
+
+
+def _to_released_between(
+    released_between: tuple[str | None, str | None],
+) -> tuple[date, date]:
+    released_from, released_to = released_between
+    return (
+        date.min if released_from is None else validate_released_at(released_from),
+        date.max if released_to is None else validate_released_at(released_to),
+    )
+
 
+def read_versions(
+    project_id: UUID,
+    page_size: int,
+    token: str | None,
+    version_range: str | None = None,
+    released_between: tuple[str | None, str | None] | None = None,
+) -> VersionsPage:
+    """Read a page of versions, newest first, or by release date when given."""
+    bounds = None if version_range is None else validate_version_range(version_range)
+    dates = None if released_between is None else _to_released_between(released_between)
+    window = _read_versions_window(project_id, page_size, token, bounds, dates)
+    versions = window.versions
+    prev_token = None
+    next_token = None
+    if versions and window.has_previous:
+        prev_token = _to_token(versions[0], "previous", by_release=dates is not None)
+    if versions and window.has_next:
+        next_token = _to_token(versions[-1], "next", by_release=dates is not None)
+    return VersionsPage(versions, encode(prev_token), encode(next_token))
 
-def read_versions(project_id: UUID, page_size: int, token: str | None) -> VersionsPage:
-    direction = "next"
-    if token is None:
-        versions = repository.read_versions(project_id, page_size + 1)
-    else:
+
+def _from_token(
+    token: str, *, by_release: bool
+) -> tuple[str, date | None, Literal["next", "previous"]]:
+    if (data := decode(token)) is None:
+        raise VersionsReadingTokenInvalidError
+    try:
+        cursor = validate_version_number(str(data["version_number"]))
+        requested = data["direction"]
+        released_at = None
+        if by_release:
+            released_at = validate_released_at(str(data["released_at"]))
+    except (KeyError, VersionNumberInvalidError, VersionReleasedAtError) as e:
+        raise VersionsReadingTokenInvalidError from e
+    if requested == "previous":
+        return cursor, released_at, "previous"
+    if requested == "next":
+        return cursor, released_at, "next"
+    raise VersionsReadingTokenInvalidError
+
+
+def _read_versions_window(
+    project_id: UUID,
+    page_size: int,
+    token: str | None,
+    bounds: VersionRange | None,
+    dates: tuple[date, date] | None,
+) -> VersionsWindow:
+    cursor = None
+    released_at = None
+    direction: Literal["next", "previous"] = "next"
+    if token is not None:
+        cursor, released_at, direction = _from_token(
+            token, by_release=dates is not None
+        )
+    if dates is None:
+        return repository.read_versions_window(
+            project_id, page_size, cursor, direction, bounds
+        )
+    at = None
+    if cursor is not None and released_at is not None:
+        at = (released_at, cursor)
+    return repository.read_release_window(
+        project_id, page_size, at, direction, dates, bounds
+    )
+
+
+def _to_token(
+    version: Version, direction: str, *, by_release: bool
+) -> list[tuple[str, str]]:
+    token = [("version_number", version.number), ("direction", direction)]
+    if by_release and version.released_at is not None:
+        token.append(("released_at", version.released_at.isoformat()))
+    return token
+
+
+def read_versions_with_changes(
+    project_id: UUID,
+    page_size: int,
+    token: str | None,
+    version_range: str | None = None,
+    released_between: tuple[str | None, str | None] | None = None,
+) -> VersionsPage:
+    """Read a page of versions like read_versions, each with its changes.
+
+    The changes of the whole page are read with one statement in the same
+    transaction as the versions.
+    """
+    with repository.unit_of_work():
+        page = read_versions(
+            project_id, page_size, token, version_range, released_between
+        )
+        changes = repository.read_changes_of_versions([v.id for v in page.versions])
+    page.versions = [
+        VersionWithChanges(
+            v.created_at,
+            v.project_id,
+            v.number,
+            v.id,
+            v.released_at,
+            changes.get(v.id, []),
+        )
+        for v in page.versions
+    ]
+    return page
+
+
+def read_latest_version(project_id: UUID, *, released: bool = False) -> Version:
+    return repository.read_latest_version(project_id, released=released)
+
+
+def read_versions_with_change_counts(
+    project_id: UUID,
+    page_size: int,
+    token: str | None,
+    version_range: str | None = None,
+    released_between: tuple[str | None, str | None] | None = None,
+) -> VersionsPage:
+    """Read a page of versions like read_versions, each with change counts.
+
+    Every version gets the number of its changes of each kind, zero
+    included. The counts of the whole page are read with one statement in
+    the same transaction as the versions.
+    """
+    with repository.unit_of_work():
+        page = read_versions(
+            project_id, page_size, token, version_range, released_between
+        )
+        counts = repository.count_changes_of_versions([v.id for v in page.versions])
+    page.versions = [
+        VersionWithChangeCounts(
+            v.created_at,
+            v.project_id,
+            v.number,
+            v.id,
+            v.released_at,
+            {kind: counts.get(v.id, {}).get(kind, 0) for kind in keepachangelog.KINDS},
+        )
+        for v in page.versions
+    ]
+    return page
+
+
+def read_project_changes(
+    project_id: UUID,
+    page_size: int,
+    token: str | None,
+    kind: str | None = None,
+    author: str | None = None,
+) -> ChangesPage:
+    """Read a page of changes of any version, newest version first."""
+    valid_kind = None if kind is None else validate_kind(kind)
+    valid_author = None if author is None else validate_author(author)
+    cursor = None
+    direction: Literal["next", "previous"] = "next"
+    if token is not None:
         if (data := decode(token)) is None:
-            raise VersionsReadingTokenInvalidError
+            raise ChangesReadingTokenInvalidError
         try:
-            version_number = data["version_number"]
-            direction = data["direction"]
-        except KeyError as k:
-            raise VersionsReadingTokenInvalidError from k
-        if direction == "next":
-            versions = repository.read_next_versions(
-                project_id, page_size + 1, version_number
-            )
-        elif direction == "previous":
-            versions = repository.read_prev_versions(
-                project_id, page_size + 1, version_number
-            )
-        else:
-            raise VersionsReadingTokenInvalidError from None
+            number = validate_version_number(str(data["version_number"]))
+            cursor = number, UUID(str(data["change_id"]))
+            requested = data["direction"]
+        except (KeyError, ValueError, VersionNumberInvalidError) as e:
+            raise ChangesReadingTokenInvalidError from e
+        if requested == "previous":
+            direction = "previous"
+        elif requested != "next":
+            raise ChangesReadingTokenInvalidError
 
-    next_token = None
+    window = repository.read_changes_window(
+        project_id, page_size, cursor, direction, valid_kind, valid_author
+    )
+    changes = window.changes
     prev_token = None
-    with contextlib.suppress(IndexError):
-        if len(versions) == page_size + 1 and direction == "next":
-            versions = versions[:-1]
-            next_token = [
-                ("version_number", versions[-1].number),
-                ("direction", "next"),
-            ]
-        elif direction == "previous" and repository.read_next_versions(
-            project_id, 1, versions[-1].number
-        ):
-            next_token = [
-                ("version_number", versions[-1].number),
-                ("direction", "next"),
-            ]
-        if len(versions) == page_size + 1 and direction == "previous":
-            versions = versions[1:]
-            prev_token = [
-                ("version_number", versions[0].number),
-                ("direction", "previous"),
-            ]
-        elif direction == "next" and repository.read_prev_versions(
-            project_id, 1, versions[0].number
-        ):
-            prev_token = [
-                ("version_number", versions[0].number),
-                ("direction", "previous"),
-            ]
-    return VersionsPage(versions, encode(prev_token), encode(next_token))
+    next_token = None
+    if changes and window.has_previous:
+        prev_token = _to_changes_token(changes[0], "previous")
+    if changes and window.has_next:
+        next_token = _to_changes_token(changes[-1], "next")
+    return ChangesPage(changes, encode(prev_token), encode(next_token))
+
+
+def _to_changes_token(change: ProjectChange, direction: str) -> list[tuple[str, str]]:
+    return [
+        ("version_number", change.version_number),
+        ("change_id", str(change.id)),
+        ("direction", direction),
+    ]
 
 
 def validate_kind(kind: str) -> str:
@@ -131,14 +359,121 @@ def create_change(
     )
 
 
+def create_changes(
+    version_number: str, project_id: UUID, changes: list[tuple[str, str, str]]
+) -> list[Change]:
+    """Create many changes, given as kind, body and author, for one version."""
+    valid_number = validate_version_number(version_number)
+    valid_changes = [
+        (validate_kind(kind), validate_body(body), validate_author(author))
+        for kind, body, author in changes
+    ]
+    return repository.create_changes(valid_number, project_id, valid_changes)
+
+
 def delete_change(version_number: str, change_id: UUID, project_id: UUID) -> Change:
     valid_number = validate_version_number(version_number)
-    return repository.delete_change(valid_number, change_id, project_id)
+    with repository.unit_of_work(write=True):
+        return repository.delete_change(valid_number, change_id, project_id)
+
 
+def read_changes_for_version(
+    version_number: str, project_id: UUID, revision: ProjectRevision
+) -> list[Change]:
+    """Read the changes of a version, those of a released one from the cache.
 
-def read_changes_for_version(version_number: str, project_id: UUID) -> list[Change]:
+    The cache answers only while the project has a revision. Deleting the
+    project removes the revision for every process, while forget_project
+    clears the cache of the deleting process only.
+    """
     valid_number = validate_version_number(version_number)
-    return repository.read_changes_for_version(valid_number, project_id)
+    key = (project_id, valid_number)
+    cached = None if revision.updated_at is None else released_changes.get(key)
+    if cached is not None:
+        return cached
+    with repository.unit_of_work():
+        version = repository.read_version(valid_number, project_id)
+        changes = repository.read_changes(version.id)
+    if version.released_at is not None:
+        released_changes.put(key, changes)
+    return changes
+
+
+def export_changelog(project_id: UUID) -> Iterator[tuple[Version, list[Change]]]:
+    """Yield every version of the project, newest first, with its changes."""
+    return repository.iter_versions_with_changes(project_id)
+
+
+def read_changes_between(
+    project_id: UUID, after: str, through: str | None
+) -> Iterator[tuple[Version, list[Change]]]:
+    """Yield the versions newer than after, up to and including through.
+
+    The version numbers are checked before the first version is read.
+    """
+    valid_after = validate_version_number(after)
+    valid_through = None if through is None else validate_version_number(through)
+    return repository.iter_versions_with_changes(
+        project_id, after=valid_after, through=valid_through
+    )
+
+
+def render_changelog(project_id: UUID) -> Iterator[str]:
+    """Render a Keep a Changelog document, newest version first.
+
+    Sections of released versions are cached.
+    """
+    yield keepachangelog.HEADER
+    for versions in repository.iter_version_batches(project_id):
+        sections = [released_sections.get((project_id, v.number)) for v in versions]
+        changes = repository.read_changes_of_versions(
+            [v.id for v, s in zip(versions, sections, strict=True) if s is None]
+        )
+        for version, cached in zip(versions, sections, strict=True):
+            if cached is not None:
+                yield cached
+                continue
+            section = keepachangelog.render_version(
+                version.number,
+                version.released_at,
+                ((c.kind, c.body) for c in changes.get(version.id, [])),
+            )
+            if version.released_at is not None:
+                released_sections.put((project_id, version.number), section)
+            yield section
+
+
+def read_changes_for_versions(
+    version_numbers: list[str], project_id: UUID
+) -> dict[str, list[Change]]:
+    """Read the changes of many versions, newest first, with two statements."""
+    valid_numbers = [validate_version_number(n) for n in version_numbers]
+    with repository.unit_of_work():
+        versions = repository.read_versions_by_number(project_id, valid_numbers)
+        changes = repository.read_changes_of_versions([v.id for v in versions])
+    return {v.number: changes.get(v.id, []) for v in versions}
+
+
+def read_project_name(project_id: UUID) -> str:
+    """Read the name of the project, cached for a short time."""
+    now = time.monotonic()
+    entry = project_names.get(project_id)
+    if entry is not None and now < entry[1]:
+        return entry[0]
+    name = project_repo.read_project(project_id).name
+    project_names.put(project_id, (name, now + _PROJECT_NAME_TTL))
+    return name
+
+
+def _forget_version(project_id: UUID, version_number: str) -> None:
+    released_changes.pop((project_id, version_number))
+    released_sections.pop((project_id, version_number))
+
+
+def forget_project(project_id: UUID) -> None:
+    released_changes.pop_matching(lambda key: key[0] == project_id)
+    released_sections.pop_matching(lambda key: key[0] == project_id)
+    project_names.pop(project_id)
 
 
 def move_change_to_other_version(
@@ -146,6 +481,58 @@ def move_change_to_other_version(
 ) -> Change:
     valid_from = validate_version_number(from_version_number)
     valid_to = validate_version_number(to_version_number)
-    return repository.move_change_to_other_version(
-        valid_from, valid_to, project_id, change_id
-    )
+    with repository.unit_of_work(write=True):
+        return repository.move_change_to_other_version(
+            valid_from, valid_to, project_id, change_id
+        )
+
+
+def read_project_revision(project_id: UUID) -> ProjectRevision:
+    return repository.read_project_revision(project_id)
+
+
+def read_monthly_rollups(project_id: UUID) -> list[MonthlyRollup]:
+    """Read releases and changes of every kind, zero included, per month."""
+    rollups = repository.read_monthly_rollups(project_id)
+    for rollup in rollups:
+        rollup.changes = {k: rollup.changes.get(k, 0) for k in keepachangelog.KINDS}
+    return rollups
+
+
+def import_changelog(
+    project_id: UUID, lines: Iterable[str], author: str, batch_rows: int = 5000
+) -> Iterator[ImportProgress]:
+    """Import a Keep a Changelog document in transactions of batch_rows rows.
+
+    Batches written before an error stay and existing versions are skipped,
+    so a failed import can be run again.
+    """
+    valid_author = validate_author(author)
+    started = time.monotonic()
+    progress = ImportProgress(0, 0, 0, 0.0)
+    batch: list[tuple[str, date | None, list[tuple[str, str, str]]]] = []
+    rows = 0
+
+    def write() -> ImportProgress:
+        versions, changes = repository.import_versions(project_id, batch)
+        progress.versions += versions
+        progress.changes += changes
+        progress.skipped_versions += len(batch) - versions
+        progress.seconds = time.monotonic() - started
+        return replace(progress)
+
+    for parsed in keepachangelog.parse(lines):
+        released_at = parsed.released_at
+        batch.append(
+            (
+                validate_version_number(parsed.number),
+                None if released_at is None else validate_released_at(released_at),
+                [(k, validate_body(b), valid_author) for k, b in parsed.changes],
+            )
+        )
+        rows += 1 + len(parsed.changes)
+        if rows >= batch_rows:
+            yield write()
+            batch, rows = [], 0
+    if batch or progress.versions + progress.skipped_versions == 0:
+        yield write()
@@ -1,9 +1,9 @@
 from uuid import UUID
 
 from flask import Blueprint, current_app, render_template, request, url_for
-from realerikrani.project import ProjectNotFoundError, project_repo
+from realerikrani.project import ProjectNotFoundError
 
-from e1004.changelog_api import service
+from e1004.changelog_api import conditional, service
 
 ui = Blueprint(
     "ui_controller", __name__, template_folder="templates", static_folder="assets"
@@ -13,16 +13,20 @@ ui = Blueprint(
 @ui.route("/<uuid:project_id>", methods=["GET", "POST"])
 def index(project_id: UUID):  # noqa: ANN201
     token = None
-    if request.method == "POST":
-        if "load_next" in request.form:
-            token = request.form.get("next", None)
-        elif "load_previous" in request.form:
-            token = request.form.get("previous", None)
-    versions_page = service.read_versions(project_id, 4, token)
+    revision = None
+    if request.method == "GET":
+        revision = service.read_project_revision(project_id)
+        if (not_modified := conditional.not_modified(revision)) is not None:
+            return not_modified
+    elif "load_next" in request.form:
+        token = request.form.get("next", None)
+    elif "load_previous" in request.form:
+        token = request.form.get("previous", None)
     try:
-        project_name = project_repo.read_project(project_id).name
+        project_name = service.read_project_name(project_id)
     except ProjectNotFoundError:
         return render_template("404.html"), 404
+    versions_page = service.read_versions(project_id, 4, token)
 
     app_prefix_enabled = current_app.config["APP_PREFIX_ENABLED"]
     styles_location = url_for("ui_controller.static", filename="css/styles.css")
@@ -36,7 +40,7 @@ def index(project_id: UUID):  # noqa: ANN201
         link_location = f"{prefix}{link_location}"
         version_location = f"{request.url_root}app/{project_id}"
 
-    return render_template(
+    page = render_template(
         "index.html",
         versions=versions_page.versions,
         previous_token=versions_page.prev_token,
@@ -48,20 +52,27 @@ def index(project_id: UUID):  # noqa: ANN201
         link_location=link_location,
         version_location=version_location,
     )
+    return page if revision is None else conditional.validated(page, revision)
 
 
 @ui.route("/<uuid:project_id>/<version_number>", methods=["GET"])
 def changes(project_id: UUID, version_number: str):  # noqa: ANN201
-    c = service.read_changes_for_version(version_number, project_id)
+    revision = service.read_project_revision(project_id)
+    if (not_modified := conditional.not_modified(revision)) is not None:
+        return not_modified
+    c = service.read_changes_for_version(version_number, project_id, revision)
 
     app_prefix_enabled = current_app.config["APP_PREFIX_ENABLED"]
     styles_location = url_for("ui_controller.static", filename="css/styles.css")
     if app_prefix_enabled:
         styles_location = "/app" + styles_location
 
-    return render_template(
-        "changes.html",
-        changes=c,
-        version_number=version_number,
-        styles_location=styles_location,
+    return conditional.validated(
+        render_template(
+            "changes.html",
+            changes=c,
+            version_number=version_number,
+            styles_location=styles_location,
+        ),
+        revision,
     )
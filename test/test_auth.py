@@ -0,0 +1,88 @@
+import time
+from collections.abc import Iterator
+from datetime import UTC, datetime
+from uuid import uuid4
+
+import jwt
+import pytest
+from flask import Flask
+from pytest_mock import MockerFixture
+from realerikrani.project import PublicKey, bearer_extractor
+
+from e1004.changelog_api import auth, repository
+
+_SECRET = "s" * 32
+_KEY = PublicKey("pem", datetime.now(UTC), uuid4(), uuid4())
+
+
+def _header(**claims: float) -> dict[str, str]:
+    return {"Authorization": f"Bearer {jwt.encode(claims, _SECRET, algorithm='HS256')}"}
+
+
+@pytest.fixture(autouse=True)
+def empty_cache() -> Iterator[None]:
+    auth.verified_keys.clear()
+    yield
+    auth.verified_keys.clear()
+
+
+@pytest.fixture
+def app() -> Flask:
+    return Flask(__name__)
+
+
+def test_it_verifies_repeated_token_once(app: Flask, mocker: MockerFixture):
+    # given
+    protect = mocker.patch.object(bearer_extractor, "protect", return_value=_KEY)
+    mocker.patch.object(repository, "key_exists", return_value=True)
+    hits = auth.verified_keys.hits
+
+    # when
+    with app.test_request_context(headers=_header()):
+        keys = [auth.protect(), auth.protect()]
+
+    # then
+    assert keys == [_KEY, _KEY]
+    protect.assert_called_once()
+    assert auth.verified_keys.hits == hits + 1
+
+
+def test_it_verifies_again_when_key_is_deleted(app: Flask, mocker: MockerFixture):
+    # given
+    protect = mocker.patch.object(bearer_extractor, "protect", return_value=_KEY)
+    mocker.patch.object(repository, "key_exists", return_value=False)
+
+    # when
+    with app.test_request_context(headers=_header()):
+        auth.protect()
+        auth.protect()
+
+    # then
+    assert protect.call_count == 2
+
+
+def test_it_verifies_again_when_token_expired(app: Flask, mocker: MockerFixture):
+    # given
+    protect = mocker.patch.object(bearer_extractor, "protect", return_value=_KEY)
+    mocker.patch.object(repository, "key_exists", return_value=True)
+
+    # when
+    with app.test_request_context(headers=_header(exp=time.time() - 1)):
+        auth.protect()
+        auth.protect()
+
+    # then
+    assert protect.call_count == 2
+
+
+def test_it_forgets_deleted_key(app: Flask, mocker: MockerFixture):
+    # given
+    mocker.patch.object(bearer_extractor, "protect", return_value=_KEY)
+    with app.test_request_context(headers=_header()):
+        auth.protect()
+
+    # when
+    auth.forget_key(_KEY.id)
+
+    # then
+    assert len(auth.verified_keys) == 0
@@ -0,0 +1,49 @@
+from e1004.changelog_api.cache import LRUCache
+
+
+def test_it_evicts_least_recently_used_entry():
+    # given
+    cache: LRUCache[str, int] = LRUCache(2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+
+    # when
+    cache.put("c", 3)
+
+    # then
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_it_bounds_total_weight():
+    # given
+    cache: LRUCache[str, list[int]] = LRUCache(5, weigh=len)
+    cache.put("a", [1, 2])
+    cache.put("b", [1, 2])
+
+    # when
+    cache.put("c", [1, 2])
+    cache.put("d", [1] * 6)
+
+    # then
+    assert cache.get("a") is None
+    assert cache.get("b") == [1, 2]
+    assert cache.get("c") == [1, 2]
+    assert cache.get("d") is None
+
+
+def test_it_removes_matching_entries():
+    # given
+    cache: LRUCache[tuple[str, str], int] = LRUCache(5)
+    cache.put(("p1", "1.0.0"), 1)
+    cache.put(("p1", "1.0.1"), 2)
+    cache.put(("p2", "1.0.0"), 3)
+
+    # when
+    cache.pop_matching(lambda key: key[0] == "p1")
+
+    # then
+    assert len(cache) == 1
+    assert cache.get(("p2", "1.0.0")) == 3
@@ -0,0 +1,45 @@
+from pathlib import Path
+from uuid import uuid4
+
+from pytest_mock import MockerFixture
+
+from e1004.changelog_api import service
+from e1004.changelog_api.app import create
+from e1004.changelog_api.error import ProjectNotFoundError
+from e1004.changelog_api.model import ImportProgress
+
+
+def test_it_imports_changelog_file(tmp_path: Path, mocker: MockerFixture):
+    # given
+    changelog = tmp_path / "CHANGELOG.md"
+    changelog.write_text("## [1.0.0] - 2024-01-01\n", encoding="utf-8")
+    import_changelog = mocker.patch.object(
+        service, "import_changelog", return_value=iter([ImportProgress(1, 3, 0, 1.5)])
+    )
+    project_id = uuid4()
+    args = ["import-changelog", str(project_id), str(changelog), "--author", "Bob"]
+
+    # when
+    result = create().test_cli_runner().invoke(args=args)
+
+    # then
+    assert result.exit_code == 0
+    assert "1 versions, 3 changes" in result.output
+    assert "2 changes/s" in result.output
+    assert import_changelog.call_args.args[0] == project_id
+    assert import_changelog.call_args.args[2:] == ("Bob", 5000)
+
+
+def test_it_reports_import_error(tmp_path: Path, mocker: MockerFixture):
+    # given
+    changelog = tmp_path / "CHANGELOG.md"
+    changelog.write_text("", encoding="utf-8")
+    mocker.patch.object(service, "import_changelog", side_effect=ProjectNotFoundError)
+    args = ["import-changelog", str(uuid4()), str(changelog)]
+
+    # when
+    result = create().test_cli_runner().invoke(args=args)
+
+    # then
+    assert result.exit_code == 1
+    assert "project missing" in result.output
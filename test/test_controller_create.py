@@ -16,8 +16,9 @@ from e1004.changelog_api.error import (
     ChangeKindInvalidError,
     VersionNotFoundError,
     VersionNumberInvalidError,
+    VersionReleasedError,
 )
-from e1004.changelog_api.model import Change, Version
+from e1004.changelog_api.model import Change, ImportProgress, Version
 
 _KEY = Mock(autospec=PublicKey)
 
@@ -139,6 +140,7 @@ def test_it_creates_change(client: FlaskClient, mocker: MockerFixture):
         VersionNumberInvalidError,
         ChangeAuthorInvalidError,
         VersionNotFoundError,
+        VersionReleasedError,
     ],
 )
 def test_it_creates_no_change_for_invalid_input(
@@ -157,3 +159,98 @@ def test_it_creates_no_change_for_invalid_input(
     assert response.status_code == 400
     assert set(response.json.keys()) == {"errors"}
     assert len(response.json["errors"]) == 1
+
+
+def test_it_creates_changes_in_bulk(client: FlaskClient, mocker: MockerFixture):
+    # given
+    change = Change(uuid4(), uuid4(), "aaa", "changed", "Bob")
+    create_changes = mocker.patch.object(
+        service, "create_changes", return_value=[change, change]
+    )
+    item = {"kind": change.kind, "body": change.body, "author": change.author}
+
+    # when
+    response = client.post("/versions/1.2.3/changes/bulk", json={"changes": [item] * 2})
+
+    # then
+    assert response.status_code == 201
+    assert len(response.json["changes"]) == 2
+    create_changes.assert_called_once_with(
+        "1.2.3", _KEY.project_id, [("changed", "aaa", "Bob")] * 2
+    )
+
+
+def test_bulk_change_creation_reports_errors_per_item(
+    client: FlaskClient, mocker: MockerFixture
+):
+    # given
+    create_changes = mocker.patch.object(service, "create_changes")
+    valid = {"kind": "added", "body": "aaa", "author": "Bob"}
+    items = [valid, {"kind": "bad", "body": "aaa"}, "not an object"]
+
+    # when
+    response = client.post("/versions/1.2.3/changes/bulk", json={"changes": items})
+
+    # then
+    assert response.status_code == 400
+    messages = [e["message"] for e in response.json["errors"]]
+    assert len(messages) == 3
+    assert messages[0].startswith("changes[1]: invalid kind")
+    assert messages[1] == "changes[1]: author missing"
+    assert messages[2] == "changes[2]: change must be an object"
+    create_changes.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [{}, {"changes": []}, {"changes": "a"}, [{"kind": "added"}], "changes"],
+)
+def test_bulk_change_creation_requires_list_of_changes(
+    client: FlaskClient, payload: object
+):
+    # when
+    response = client.post("/versions/1.2.3/changes/bulk", json=payload)
+
+    # then
+    assert response.status_code == 400
+    assert set(response.json.keys()) == {"errors"}
+
+
+def test_it_imports_changelog(client: FlaskClient, mocker: MockerFixture):
+    # given
+    import_changelog = mocker.patch.object(
+        service, "import_changelog", return_value=iter([ImportProgress(2, 5, 1, 0.5)])
+    )
+
+    # when
+    response = client.post(
+        "/versions/import?author=Bob", data="## [1.0.0]\n", content_type="text/markdown"
+    )
+
+    # then
+    assert response.status_code == 201
+    assert response.json["import"] == {
+        "versions": 2,
+        "changes": 5,
+        "skipped_versions": 1,
+        "seconds": 0.5,
+    }
+    project_id, lines, author = import_changelog.call_args.args
+    assert project_id == _KEY.project_id
+    assert author == "Bob"
+    assert list(lines) == ["## [1.0.0]\n"]
+
+
+def test_it_returns_error_for_invalid_changelog(
+    client: FlaskClient, mocker: MockerFixture
+):
+    # given
+    mocker.patch.object(
+        service, "import_changelog", side_effect=VersionNumberInvalidError
+    )
+
+    # when
+    response = client.post("/versions/import", data="## [1.0.0]\n")
+
+    # then
+    assert response.status_code == 400
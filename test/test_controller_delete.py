@@ -1,4 +1,4 @@
-from datetime import date
+from datetime import UTC, date, datetime
 from unittest.mock import Mock
 from uuid import uuid4
 
@@ -6,9 +6,9 @@ import pytest
 from flask import Flask
 from flask.testing import FlaskClient
 from pytest_mock import MockerFixture
-from realerikrani.project import PublicKey, bearer_extractor
+from realerikrani.project import Project, PublicKey, bearer_extractor, project_repo
 
-from e1004.changelog_api import service
+from e1004.changelog_api import auth, service
 from e1004.changelog_api.app import create
 from e1004.changelog_api.error import (
     ChangeNotFoundError,
@@ -151,3 +151,34 @@ def test_it_returns_error_for_invalid_change_deletion(
 
     # then
     assert response.status_code == error_code
+
+
+def test_it_forgets_project_after_deleting_it(
+    client: FlaskClient, mocker: MockerFixture
+):
+    # given
+    project = Project("name", uuid4())
+    mocker.patch.object(project_repo, "delete_project", return_value=project)
+    forget_project = mocker.patch.object(service, "forget_project")
+
+    # when
+    response = client.delete("/projects")
+
+    # then
+    assert response.status_code == 200
+    forget_project.assert_called_once_with(project.id)
+
+
+def test_it_forgets_key_after_deleting_it(client: FlaskClient, mocker: MockerFixture):
+    # given
+    key_id = uuid4()
+    deleted = PublicKey("pem", datetime.now(UTC), uuid4(), key_id)
+    mocker.patch.object(project_repo, "delete_key", return_value=deleted)
+    forget_key = mocker.patch.object(auth, "forget_key")
+
+    # when
+    response = client.delete(f"/keys/{key_id}")
+
+    # then
+    assert response.status_code == 200
+    forget_key.assert_called_once_with(key_id)
@@ -1,4 +1,6 @@
-from datetime import date
+import json
+from dataclasses import astuple
+from datetime import UTC, date, datetime
 from unittest.mock import Mock
 from uuid import uuid4
 
@@ -11,11 +13,25 @@ from realerikrani.project import PublicKey, bearer_extractor
 from e1004.changelog_api import service
 from e1004.changelog_api.app import create
 from e1004.changelog_api.error import (
+    ChangeKindInvalidError,
+    ChangesReadingTokenInvalidError,
     VersionNotFoundError,
     VersionNumberInvalidError,
+    VersionRangeInvalidError,
+    VersionReleasedAtError,
     VersionsReadingTokenInvalidError,
 )
-from e1004.changelog_api.model import Change, Version, VersionsPage
+from e1004.changelog_api.model import (
+    Change,
+    ChangesPage,
+    MonthlyRollup,
+    ProjectChange,
+    ProjectRevision,
+    Version,
+    VersionsPage,
+    VersionWithChangeCounts,
+    VersionWithChanges,
+)
 
 _KEY = Mock(autospec=PublicKey)
 
@@ -37,6 +53,13 @@ def protect(mocker: MockerFixture):
     mocker.patch.object(bearer_extractor, "protect", return_value=_KEY)
 
 
+@pytest.fixture(autouse=True)
+def revision(mocker: MockerFixture) -> ProjectRevision:
+    revision = ProjectRevision(_KEY.project_id, 3, datetime(2024, 5, 1, tzinfo=UTC))
+    mocker.patch.object(service, "read_project_revision", return_value=revision)
+    return revision
+
+
 def test_it_reads_versions_without_request_params(
     client: FlaskClient, mocker: MockerFixture
 ):
@@ -66,7 +89,7 @@ def test_it_reads_versions_without_request_params(
     assert response.json["versions"][0]["created_at"] == version.created_at.isoformat()
     assert response.json["previous_token"] == "any_prev"
     assert response.json["next_token"] == "any_next"
-    read_versions.assert_called_once_with(_KEY.project_id, 5, None)
+    read_versions.assert_called_once_with(_KEY.project_id, 5, None, None, None)
 
 
 def test_it_reads_versions_with_request_params(
@@ -86,7 +109,7 @@ def test_it_reads_versions_with_request_params(
     assert response.status_code == 200
     assert response.json["previous_token"] is None
     assert response.json["next_token"] is None
-    read_versions.assert_called_once_with(_KEY.project_id, page_size, token)
+    read_versions.assert_called_once_with(_KEY.project_id, page_size, token, None, None)
 
 
 def test_it_returns_error_for_invalid_versions_reading(
@@ -104,7 +127,9 @@ def test_it_returns_error_for_invalid_versions_reading(
     assert response.status_code == 400
 
 
-def test_it_reads_changes_for_version(client: FlaskClient, mocker: MockerFixture):
+def test_it_reads_changes_for_version(
+    client: FlaskClient, mocker: MockerFixture, revision: ProjectRevision
+):
     # given
     valid_number = "1.0.0"
     change_1 = Change(uuid4(), uuid4(), "body", "fixed", "Bob")
@@ -126,7 +151,7 @@ def test_it_reads_changes_for_version(client: FlaskClient, mocker: MockerFixture
         "body",
         "author",
     }
-    read_changes.assert_called_once_with(valid_number, _KEY.project_id)
+    read_changes.assert_called_once_with(valid_number, _KEY.project_id, revision)
 
 
 @pytest.mark.parametrize(
@@ -148,3 +173,415 @@ def test_it_returns_error_for_invalid_changes_reading(
 
     # then
     assert response.status_code == error_code
+
+
+@pytest.mark.parametrize("path", ["/versions?page_size=2", "/versions/1.0.0/changes"])
+def test_it_returns_not_modified_for_matching_etag(
+    client: FlaskClient, mocker: MockerFixture, path: str
+):
+    # given
+    mocker.patch.object(
+        service, "read_versions", return_value=VersionsPage([], None, None)
+    )
+    mocker.patch.object(service, "read_changes_for_version", return_value=[])
+    etag = client.get(path).headers["ETag"]
+    read_versions = mocker.patch.object(service, "read_versions")
+    read_changes = mocker.patch.object(service, "read_changes_for_version")
+
+    # when
+    response = client.get(path, headers={"If-None-Match": etag})
+
+    # then
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    assert response.data == b""
+    read_versions.assert_not_called()
+    read_changes.assert_not_called()
+
+
+def test_it_returns_versions_when_revision_changed(
+    client: FlaskClient, mocker: MockerFixture, revision: ProjectRevision
+):
+    # given
+    mocker.patch.object(
+        service, "read_versions", return_value=VersionsPage([], None, None)
+    )
+    etag = client.get("/versions").headers["ETag"]
+    mocker.patch.object(
+        service,
+        "read_project_revision",
+        return_value=ProjectRevision(revision.project_id, 4, revision.updated_at),
+    )
+
+    # when
+    response = client.get("/versions", headers={"If-None-Match": etag})
+
+    # then
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_it_ignores_if_modified_since(client: FlaskClient, mocker: MockerFixture):
+    # given
+    read_versions = mocker.patch.object(
+        service, "read_versions", return_value=VersionsPage([], None, None)
+    )
+
+    # when
+    response = client.get(
+        "/versions", headers={"If-Modified-Since": "Wed, 01 May 2024 00:00:00 GMT"}
+    )
+
+    # then
+    assert response.status_code == 200
+    assert response.headers["Last-Modified"] == "Wed, 01 May 2024 00:00:00 GMT"
+    read_versions.assert_called_once()
+
+
+def test_it_exports_versions_with_changes_as_ndjson(
+    client: FlaskClient, mocker: MockerFixture
+):
+    # given
+    project_id = uuid4()
+    v1 = Version(date.today(), project_id, "1.0.0", uuid4(), date.today())
+    v2 = Version(date.today(), project_id, "2.0.0", uuid4(), None)
+    change = Change(uuid4(), v1.id, "body", "added", "Bob")
+    export_changelog = mocker.patch.object(
+        service, "export_changelog", return_value=iter([(v2, []), (v1, [change])])
+    )
+
+    # when
+    response = client.get("/versions/export")
+
+    # then
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    assert "ETag" in response.headers
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [line["version"]["number"] for line in lines] == ["2.0.0", "1.0.0"]
+    assert lines[0]["changes"] == []
+    assert lines[1]["changes"][0]["id"] == str(change.id)
+    export_changelog.assert_called_once_with(_KEY.project_id)
+
+
+def test_it_renders_changelog_as_markdown(client: FlaskClient, mocker: MockerFixture):
+    # given
+    sections = iter(["# Changelog\n", "\n## [1.0.0]\n"])
+    render = mocker.patch.object(service, "render_changelog", return_value=sections)
+
+    # when
+    response = client.get("/versions/changelog")
+
+    # then
+    assert response.status_code == 200
+    assert response.mimetype == "text/markdown"
+    assert response.get_data(as_text=True) == "# Changelog\n\n## [1.0.0]\n"
+    assert "ETag" in response.headers
+    render.assert_called_once_with(_KEY.project_id)
+
+
+def test_it_reads_versions_with_changes(client: FlaskClient, mocker: MockerFixture):
+    # given
+    version = Version(date.today(), uuid4(), "1.0.0", uuid4(), None)
+    change = Change(uuid4(), version.id, "body", "added", "Bob")
+    read = mocker.patch.object(
+        service,
+        "read_versions_with_changes",
+        return_value=VersionsPage(
+            [VersionWithChanges(*astuple(version), [change])], None, None
+        ),
+    )
+
+    # when
+    response = client.get("/versions?include=changes&page_size=3")
+
+    # then
+    assert response.status_code == 200
+    assert response.json["versions"][0]["number"] == "1.0.0"
+    assert response.json["versions"][0]["changes"][0]["id"] == str(change.id)
+    read.assert_called_once_with(_KEY.project_id, 3, None, None, None)
+
+
+def test_it_rejects_unknown_include(client: FlaskClient, mocker: MockerFixture):
+    # given
+    read_versions = mocker.patch.object(service, "read_versions")
+
+    # when
+    response = client.get("/versions?include=authors")
+
+    # then
+    assert response.status_code == 400
+    read_versions.assert_not_called()
+
+
+def test_it_reads_changes_for_versions(client: FlaskClient, mocker: MockerFixture):
+    # given
+    change = Change(uuid4(), uuid4(), "body", "added", "Bob")
+    read = mocker.patch.object(
+        service,
+        "read_changes_for_versions",
+        return_value={"1.0.1": [change], "1.0.0": []},
+    )
+
+    # when
+    response = client.get("/versions/changes?version_number=1.0.0&version_number=1.0.1")
+
+    # then
+    assert response.status_code == 200
+    assert response.json["changes"]["1.0.0"] == []
+    assert response.json["changes"]["1.0.1"][0]["id"] == str(change.id)
+    read.assert_called_once_with(["1.0.0", "1.0.1"], _KEY.project_id)
+
+
+@pytest.mark.parametrize(
+    ("path", "error", "error_code"),
+    [
+        ("/versions/changes", None, 400),
+        ("/versions/changes?version_number=1.0", VersionNumberInvalidError, 400),
+        ("/versions/changes?version_number=1.0.0", VersionNotFoundError, 404),
+    ],
+)
+def test_reading_changes_for_versions_returns_error(
+    client: FlaskClient,
+    mocker: MockerFixture,
+    path: str,
+    error: type[Exception] | None,
+    error_code: int,
+):
+    # given
+    mocker.patch.object(service, "read_changes_for_versions", side_effect=error)
+
+    # when
+    response = client.get(path)
+
+    # then
+    assert response.status_code == error_code
+
+
+def test_it_reads_changes_between_versions(client: FlaskClient, mocker: MockerFixture):
+    # given
+    version = Version(date.today(), uuid4(), "1.9.3", uuid4(), None)
+    change = Change(uuid4(), version.id, "body", "fixed", "Bob")
+    read = mocker.patch.object(
+        service, "read_changes_between", return_value=iter([(version, [change])])
+    )
+
+    # when
+    response = client.get("/versions/changes/range?from=1.2.0&to=1.9.3")
+
+    # then
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    line = json.loads(response.get_data(as_text=True))
+    assert line["version"]["number"] == "1.9.3"
+    assert line["changes"][0]["body"] == "body"
+    read.assert_called_once_with(_KEY.project_id, "1.2.0", "1.9.3")
+
+
+@pytest.mark.parametrize(
+    ("path", "error"),
+    [
+        ("/versions/changes/range?to=1.9.3", None),
+        ("/versions/changes/range?from=1.2", VersionNumberInvalidError),
+    ],
+)
+def test_reading_changes_between_versions_returns_error(
+    client: FlaskClient,
+    mocker: MockerFixture,
+    path: str,
+    error: type[Exception] | None,
+):
+    # given
+    mocker.patch.object(service, "read_changes_between", side_effect=error)
+
+    # when
+    response = client.get(path)
+
+    # then
+    assert response.status_code == 400
+
+
+def test_it_reads_versions_in_range(client: FlaskClient, mocker: MockerFixture):
+    # given
+    read_versions = mocker.patch.object(
+        service, "read_versions", return_value=VersionsPage([], None, None)
+    )
+
+    # when
+    response = client.get("/versions", query_string={"range": ">=1.4.0,<2.0.0"})
+
+    # then
+    assert response.status_code == 200
+    read_versions.assert_called_once_with(
+        _KEY.project_id, 5, None, ">=1.4.0,<2.0.0", None
+    )
+
+
+def test_reading_versions_returns_error_for_invalid_range(
+    client: FlaskClient, mocker: MockerFixture
+):
+    # given
+    mocker.patch.object(service, "read_versions", side_effect=VersionRangeInvalidError)
+
+    # when
+    response = client.get("/versions?range=nope")
+
+    # then
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize(
+    ("path", "released"),
+    [("/versions/latest", False), ("/versions/latest/released", True)],
+)
+def test_it_reads_latest_version(
+    client: FlaskClient,
+    mocker: MockerFixture,
+    path: str,
+    released: bool,  # noqa: FBT001
+):
+    # given
+    version = Version(date.today(), uuid4(), "1.2.3", uuid4(), None)
+    read = mocker.patch.object(service, "read_latest_version", return_value=version)
+
+    # when
+    response = client.get(path)
+
+    # then
+    assert response.status_code == 200
+    assert response.json["version"]["number"] == "1.2.3"
+    assert "ETag" in response.headers
+    read.assert_called_once_with(_KEY.project_id, released=released)
+
+
+def test_reading_latest_version_returns_not_found(
+    client: FlaskClient, mocker: MockerFixture
+):
+    # given
+    mocker.patch.object(
+        service, "read_latest_version", side_effect=VersionNotFoundError
+    )
+
+    # when
+    response = client.get("/versions/latest/released")
+
+    # then
+    assert response.status_code == 404
+
+
+def test_it_reads_versions_released_between(client: FlaskClient, mocker: MockerFixture):
+    # given
+    read_versions = mocker.patch.object(
+        service, "read_versions", return_value=VersionsPage([], None, None)
+    )
+
+    # when
+    response = client.get("/versions?released_from=2024-07-01&released_to=2024-09-30")
+
+    # then
+    assert response.status_code == 200
+    read_versions.assert_called_once_with(
+        _KEY.project_id, 5, None, None, ("2024-07-01", "2024-09-30")
+    )
+
+
+def test_reading_versions_returns_error_for_invalid_release_date(
+    client: FlaskClient, mocker: MockerFixture
+):
+    # given
+    mocker.patch.object(service, "read_versions", side_effect=VersionReleasedAtError)
+
+    # when
+    response = client.get("/versions?released_to=Q3")
+
+    # then
+    assert response.status_code == 400
+
+
+def test_it_reads_versions_with_change_counts(
+    client: FlaskClient, mocker: MockerFixture
+):
+    # given
+    version = Version(date.today(), uuid4(), "1.0.0", uuid4(), None)
+    read = mocker.patch.object(
+        service,
+        "read_versions_with_change_counts",
+        return_value=VersionsPage(
+            [VersionWithChangeCounts(*astuple(version), {"added": 2})], None, None
+        ),
+    )
+
+    # when
+    response = client.get("/versions?include=change_counts")
+
+    # then
+    assert response.status_code == 200
+    assert response.json["versions"][0]["change_counts"] == {"added": 2}
+    read.assert_called_once_with(_KEY.project_id, 5, None, None, None)
+
+
+def test_it_reads_analytics(client: FlaskClient, mocker: MockerFixture):
+    # given
+    rollup = MonthlyRollup("2024-07", 2, {"fixed": 1})
+    read = mocker.patch.object(service, "read_monthly_rollups", return_value=[rollup])
+
+    # when
+    response = client.get("/versions/analytics")
+
+    # then
+    assert response.status_code == 200
+    assert response.json == {
+        "months": [{"month": "2024-07", "releases": 2, "changes": {"fixed": 1}}]
+    }
+    assert "ETag" in response.headers
+    read.assert_called_once_with(_KEY.project_id)
+
+
+def test_it_reads_project_changes(client: FlaskClient, mocker: MockerFixture):
+    # given
+    change = ProjectChange(uuid4(), uuid4(), "body", "security", "Bob", "1.2.0")
+    read = mocker.patch.object(
+        service,
+        "read_project_changes",
+        return_value=ChangesPage([change], None, "any_next"),
+    )
+
+    # when
+    response = client.get(
+        "/versions/changes/search?kind=security&author=Bob&page_size=1"
+    )
+
+    # then
+    assert response.status_code == 200
+    assert response.json["changes"][0]["version_number"] == "1.2.0"
+    assert response.json["previous_token"] is None
+    assert response.json["next_token"] == "any_next"
+    assert "ETag" in response.headers
+    read.assert_called_once_with(_KEY.project_id, 1, None, "security", "Bob")
+
+
+@pytest.mark.parametrize(
+    ("path", "error"),
+    [
+        ("/versions/changes/search", None),
+        ("/versions/changes/search?kind=new", ChangeKindInvalidError),
+        (
+            "/versions/changes/search?author=Bob&page_token=x",
+            ChangesReadingTokenInvalidError,
+        ),
+    ],
+)
+def test_reading_project_changes_returns_error(
+    client: FlaskClient,
+    mocker: MockerFixture,
+    path: str,
+    error: type[Exception] | None,
+):
+    # given
+    mocker.patch.object(service, "read_project_changes", side_effect=error)
+
+    # when
+    response = client.get(path)
+
+    # then
+    assert response.status_code == 400
@@ -0,0 +1,122 @@
+import sqlite3
+from pathlib import Path
+from uuid import UUID, uuid4
+
+import pytest
+from realerikrani.project.db import CREATE_TABLES as PROJECT_TABLES
+
+from e1004.changelog_api.db import CREATE_TABLES, MIGRATIONS
+from e1004.changelog_api.pool import ConnectionPool
+
+
+def test_it_migrates_database_created_with_first_schema(tmp_path: Path):
+    # given
+    db_name = str(tmp_path / "old.sqlite")
+    project_id, version_id, change_id = str(uuid4()), str(uuid4()), str(uuid4())
+    with sqlite3.connect(db_name) as connection:
+        connection.executescript(PROJECT_TABLES + CREATE_TABLES)
+        connection.execute("INSERT INTO project VALUES ('p', ?)", (project_id,))
+        connection.execute(
+            "INSERT INTO version VALUES (?, 1, 20, 3, ?, 0, NULL)",
+            (project_id, version_id),
+        )
+        connection.execute(
+            "INSERT INTO change VALUES (?, ?, 'body', 'added', 'Bob')",
+            (change_id, version_id),
+        )
+    connection.close()
+    pool = ConnectionPool(
+        CREATE_TABLES,
+        db_name,
+        ["PRAGMA foreign_keys = 1"],
+        migrations=MIGRATIONS,
+        functions={"uuid_blob": lambda value: UUID(value).bytes},
+    )
+
+    # when
+    version, change, user_version = pool.query(
+        lambda c: (
+            c.execute("SELECT * FROM version").fetchone(),
+            c.execute("SELECT * FROM change").fetchone(),
+            c.execute("PRAGMA user_version").fetchone()[0],
+        )
+    )
+    pool.close()
+
+    # then
+    assert user_version == len(MIGRATIONS)
+    assert version[4] == UUID(version_id).bytes
+    assert version[7] == (1 << 42) | (20 << 21) | 3
+    assert change[0] == UUID(change_id).bytes
+    assert change[1] == UUID(version_id).bytes
+    assert change[5] == project_id
+    assert change[6] == version[7]
+
+
+@pytest.mark.parametrize("patch", [2097152, 20240101])
+def test_it_stops_migrating_version_number_parts_out_of_range(
+    tmp_path: Path, patch: int
+):
+    # given
+    db_name = str(tmp_path / "old.sqlite")
+    project_id = str(uuid4())
+    with sqlite3.connect(db_name) as connection:
+        connection.executescript(PROJECT_TABLES + CREATE_TABLES)
+        connection.execute("INSERT INTO project VALUES ('p', ?)", (project_id,))
+        connection.execute(
+            "INSERT INTO version VALUES (?, 1, 0, ?, ?, 0, NULL)",
+            (project_id, patch, str(uuid4())),
+        )
+        connection.execute(
+            "INSERT INTO version VALUES (?, 1, 1, 0, ?, 0, NULL)",
+            (project_id, str(uuid4())),
+        )
+    connection.close()
+    pool = ConnectionPool(CREATE_TABLES, db_name, [], migrations=MIGRATIONS)
+
+    # then
+    with pytest.raises(sqlite3.IntegrityError, match="must be below 2097152"):
+        # when
+        pool.query(lambda c: c.execute("SELECT 1").fetchone())
+    pool.close()
+    with sqlite3.connect(db_name) as connection:
+        assert connection.execute("PRAGMA user_version").fetchone() == (0,)
+    connection.close()
+
+
+def test_it_fills_monthly_rollups_when_migrating(tmp_path: Path):
+    # given
+    db_name = str(tmp_path / "old.sqlite")
+    project_id, version_id = str(uuid4()), str(uuid4())
+    with sqlite3.connect(db_name) as connection:
+        connection.executescript(PROJECT_TABLES + CREATE_TABLES)
+        connection.execute("INSERT INTO project VALUES ('p', ?)", (project_id,))
+        connection.execute(
+            "INSERT INTO version VALUES (?, 1, 0, 0, ?, 0, 1719964800)",
+            (project_id, version_id),
+        )
+        connection.execute(
+            "INSERT INTO change VALUES (?, ?, 'body', 'fixed', 'Bob')",
+            (str(uuid4()), version_id),
+        )
+    connection.close()
+    pool = ConnectionPool(
+        CREATE_TABLES,
+        db_name,
+        ["PRAGMA foreign_keys = 1"],
+        migrations=MIGRATIONS,
+        functions={"uuid_blob": lambda value: UUID(value).bytes},
+    )
+
+    # when
+    releases, changes = pool.query(
+        lambda c: (
+            c.execute("SELECT month, releases FROM release_rollup").fetchall(),
+            c.execute("SELECT month, kind, changes FROM change_rollup").fetchall(),
+        )
+    )
+    pool.close()
+
+    # then
+    assert releases == [("2024-07", 1)]
+    assert changes == [("2024-07", "fixed", 1)]
@@ -0,0 +1,55 @@
+import json
+from datetime import UTC, date, datetime
+from uuid import uuid4
+
+import pytest
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from e1004.changelog_api.app import create
+from e1004.changelog_api.json_provider import ChangelogJSONProvider
+from e1004.changelog_api.model import Change, Version, VersionsPage
+
+
+@pytest.fixture
+def app() -> Flask:
+    return create()
+
+
+def _iso_default(obj: object) -> object:
+    if isinstance(obj, datetime | date):
+        return obj.isoformat()
+    return DefaultJSONProvider.default(obj)
+
+
+def test_it_writes_same_json_as_default_provider(app: Flask):
+    # given
+    version = Version(date(2024, 1, 2), uuid4(), "1.0.0", uuid4(), None)
+    change = Change(uuid4(), version.id, 'body "ä"\n', "fixed", "Bob")
+    body = {
+        "page": VersionsPage([version], None, "token"),
+        "changes": [change],
+        "count": 1,
+        "ratio": 0.5,
+        "ok": True,
+        "at": datetime(2024, 1, 2, 3, 4, 5, tzinfo=UTC),
+    }
+    expected = json.dumps(
+        body,
+        default=_iso_default,
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+
+    # when
+    with app.app_context():
+        result = app.json.response(body)
+
+    # then
+    assert result.get_data(as_text=True) == expected + "\n"
+    assert result.mimetype == "application/json"
+
+
+def test_it_is_installed_on_app(app: Flask):
+    # then
+    assert isinstance(app.json, ChangelogJSONProvider)
@@ -0,0 +1,104 @@
+from datetime import date
+
+from e1004.changelog_api.keepachangelog import (
+    HEADER,
+    ParsedVersion,
+    parse,
+    render_version,
+)
+
+_CHANGELOG = """# Changelog
+
+All notable changes to this project will be documented in this file.
+
+## [Unreleased]
+
+### Added
+
+- Not released yet
+
+## [1.1.0] - 2024-03-05
+
+### Added
+
+- New endpoint
+  spanning two lines
+- Another one
+
+### Fixed
+
+* A bug
+
+### Notes
+
+- Not a kind
+
+## 1.0.0
+
+### Removed
+
+- Old endpoint
+
+[1.1.0]: https://example.com/compare/1.0.0...1.1.0
+"""
+
+
+def test_it_parses_versions_and_changes():
+    # when
+    result = list(parse(_CHANGELOG.splitlines(keepends=True)))
+
+    # then
+    assert result == [
+        ParsedVersion(
+            "1.1.0",
+            "2024-03-05",
+            [
+                ("added", "New endpoint spanning two lines"),
+                ("added", "Another one"),
+                ("fixed", "A bug"),
+            ],
+        ),
+        ParsedVersion("1.0.0", None, [("removed", "Old endpoint")]),
+    ]
+
+
+def test_it_parses_whole_version_numbers_and_dates():
+    # given
+    lines = [
+        "## [1.0.0-rc.1] - 2024-01-01",
+        "## [0.9.0.1]",
+        "## v0.8.0 - 2023-12-1 [YANKED]",
+    ]
+
+    # when
+    result = list(parse(lines))
+
+    # then
+    assert result == [
+        ParsedVersion("1.0.0-rc.1", "2024-01-01"),
+        ParsedVersion("0.9.0.1", None),
+        ParsedVersion("0.8.0", "2023-12-1"),
+    ]
+
+
+def test_it_parses_empty_document():
+    assert list(parse([])) == []
+
+
+def test_it_renders_versions_that_parse_back():
+    # given
+    document = (
+        HEADER
+        + render_version("1.1.0", None, [("fixed", "A bug"), ("added", "New\nline")])
+        + render_version("1.0.0", date(2024, 3, 5), [])
+    )
+
+    # when
+    result = list(parse(document.splitlines(keepends=True)))
+
+    # then
+    assert document.startswith("# Changelog\n\n## [1.1.0]\n\n### Added\n\n- New\n")
+    assert result == [
+        ParsedVersion("1.1.0", None, [("added", "New line"), ("fixed", "A bug")]),
+        ParsedVersion("1.0.0", "2024-03-05", []),
+    ]
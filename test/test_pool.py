@@ -0,0 +1,118 @@
+import sqlite3
+from collections.abc import Iterator
+
+import pytest
+
+from e1004.changelog_api.pool import ConnectionPool, PoolExhaustedError
+
+_SCHEMA = "CREATE TABLE IF NOT EXISTS item (name TEXT NOT NULL);"
+
+
+@pytest.fixture
+def pool() -> Iterator[ConnectionPool]:
+    p = ConnectionPool(
+        _SCHEMA,
+        "file:pool_test?mode=memory&cache=shared",
+        ["PRAGMA foreign_keys = 1"],
+        size=2,
+        timeout=0.01,
+    )
+    with p.connection():  # keeps the shared in-memory database alive
+        yield p
+    p.close()
+
+
+def test_it_reuses_returned_connection(pool: ConnectionPool):
+    # given
+    with pool.connection() as connection:
+        first = connection
+
+    # when
+    with pool.connection() as connection:
+        second = connection
+
+    # then
+    assert first is second
+
+
+def test_it_creates_schema_and_commits_query(pool: ConnectionPool):
+    # given
+    pool.query(lambda c: c.execute("INSERT INTO item(name) VALUES ('a')"))
+
+    # when
+    result = pool.query(lambda c: c.execute("SELECT name FROM item").fetchall())
+
+    # then
+    assert [r[0] for r in result] == ["a"]
+
+
+def test_it_rolls_back_failed_query(pool: ConnectionPool):
+    # given
+    def failing(c: sqlite3.Cursor) -> None:
+        c.execute("INSERT INTO item(name) VALUES ('b')")
+        c.execute("INSERT INTO item(name) VALUES (NULL)")
+
+    # when
+    with pytest.raises(sqlite3.IntegrityError):
+        pool.query(failing)
+
+    # then
+    result = pool.query(lambda c: c.execute("SELECT name FROM item").fetchall())
+    assert result == []
+
+
+def test_it_raises_error_when_pool_is_exhausted(pool: ConnectionPool):
+    # then
+    with pool.connection(), pytest.raises(PoolExhaustedError):  # noqa: SIM117
+        # when
+        with pool.connection():
+            pass
+
+
+def test_it_replaces_unhealthy_connection(pool: ConnectionPool):
+    # given
+    pool._health_check_interval = 0  # noqa: SLF001
+    with pool.connection() as connection:
+        broken = connection
+    broken.close()
+
+    # when
+    with pool.connection() as connection:
+        replacement = connection
+
+    # then
+    assert replacement is not broken
+    assert replacement.execute("SELECT 1").fetchone()[0] == 1
+
+
+def test_it_runs_nested_queries_in_one_transaction(pool: ConnectionPool):
+    # given
+    insert = "INSERT INTO item(name) VALUES ('c')"
+
+    # when
+    with pool.transaction(write=True) as outer:
+        pool.query(lambda c: c.execute(insert))
+        with pool.transaction() as inner:
+            in_transaction = inner.in_transaction
+
+    # then
+    assert inner is outer
+    assert in_transaction
+    result = pool.query(lambda c: c.execute("SELECT name FROM item").fetchall())
+    assert [r[0] for r in result] == ["c"]
+
+
+def test_it_rolls_back_whole_transaction(pool: ConnectionPool):
+    # given
+    def insert_then_fail() -> None:
+        with pool.transaction(write=True):
+            pool.query(lambda c: c.execute("INSERT INTO item(name) VALUES ('d')"))
+            pool.query(lambda c: c.execute("INSERT INTO item(name) VALUES (NULL)"))
+
+    # when
+    with pytest.raises(sqlite3.IntegrityError):
+        insert_then_fail()
+
+    # then
+    result = pool.query(lambda c: c.execute("SELECT name FROM item").fetchall())
+    assert result == []
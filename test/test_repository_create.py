@@ -1,5 +1,5 @@
 import sqlite3
-from datetime import UTC, datetime
+from datetime import UTC, date, datetime
 from uuid import UUID, uuid4
 
 import pytest
@@ -11,8 +11,17 @@ from e1004.changelog_api.error import (
     ProjectNotFoundError,
     VersionDuplicateError,
     VersionNotFoundError,
+    VersionReleasedError,
+)
+from e1004.changelog_api.repository import (
+    create_change,
+    create_changes,
+    create_version,
+    import_versions,
+    read_changes,
+    read_version,
+    release_version,
 )
-from e1004.changelog_api.repository import create_change, create_version
 
 
 @pytest.fixture
@@ -98,3 +107,73 @@ def test_it_creates_no_change_for_missing_version():
     with pytest.raises(VersionNotFoundError):
         # when
         create_change("2.0.9", uuid4(), "fixed", "body", "author")
+
+
+def test_it_creates_no_change_for_released_version(project_1: Project):
+    # given
+    create_version("2.0.9", project_1.id)
+    release_version("2.0.9", project_1.id, date(2024, 3, 5))
+
+    # then
+    with pytest.raises(VersionReleasedError):
+        # when
+        create_change("2.0.9", project_1.id, "fixed", "body", "author")
+
+
+def test_it_creates_changes(project_1: Project):
+    # given
+    version = create_version("2.3.6", project_1.id)
+    changes = [("added", "a", "Bob"), ("fixed", "b", "Alice")]
+
+    # when
+    result = create_changes("2.3.6", project_1.id, changes)
+
+    # then
+    assert [(c.kind, c.body, c.author) for c in result] == changes
+    assert {c.version_id for c in result} == {version.id}
+    assert {c.id for c in read_changes(version.id)} == {c.id for c in result}
+
+
+def test_it_creates_no_changes_for_missing_version(project_1: Project):
+    # then
+    with pytest.raises(VersionNotFoundError):
+        # when
+        create_changes("2.0.9", project_1.id, [("fixed", "body", "author")])
+
+
+def test_it_creates_no_changes_for_released_version(project_1: Project):
+    # given
+    version = create_version("2.0.9", project_1.id)
+    release_version("2.0.9", project_1.id, date(2024, 3, 5))
+
+    # then
+    with pytest.raises(VersionReleasedError):
+        # when
+        create_changes("2.0.9", project_1.id, [("fixed", "body", "author")])
+    assert read_changes(version.id) == []
+
+
+def test_it_imports_versions(project_1: Project):
+    # given
+    create_version("1.0.0", project_1.id)
+    versions = [
+        ("1.1.0", date(2024, 3, 5), [("added", "a", "Bob"), ("fixed", "b", "Bob")]),
+        ("1.0.0", date(2024, 1, 1), [("added", "c", "Bob")]),
+    ]
+
+    # when
+    result = import_versions(project_1.id, versions)
+
+    # then
+    assert result == (1, 2)
+    version = read_version("1.1.0", project_1.id)
+    assert version.released_at == date(2024, 3, 5)
+    assert len(read_changes(version.id)) == 2
+    assert read_version("1.0.0", project_1.id).released_at is None
+
+
+def test_it_imports_no_versions_for_missing_project():
+    # then
+    with pytest.raises(ProjectNotFoundError):
+        # when
+        import_versions(uuid4(), [("1.0.0", None, [])])
@@ -1,16 +1,32 @@
-from uuid import uuid4
+from datetime import date
+from uuid import UUID, uuid4
 
 import pytest
 from realerikrani.project import Project, project_repo
 
 from e1004.changelog_api.error import VersionNotFoundError
+from e1004.changelog_api.model import VersionRange
 from e1004.changelog_api.repository import (
+    count_changes_of_versions,
     create_change,
     create_version,
-    read_changes_for_version,
-    read_next_versions,
-    read_prev_versions,
-    read_versions,
+    delete_change,
+    delete_version,
+    iter_version_batches,
+    iter_versions_with_changes,
+    move_change_to_other_version,
+    read_changes,
+    read_changes_of_versions,
+    read_changes_window,
+    read_latest_version,
+    read_monthly_rollups,
+    read_project_revision,
+    read_release_window,
+    read_version,
+    read_versions_by_number,
+    read_versions_window,
+    release_version,
+    to_number_key,
 )
 
 
@@ -21,49 +37,68 @@ def project_1():
     project_repo.delete_project(p.id)
 
 
-def test_it_reads_versions(project_1: Project):
-    # given
+@pytest.fixture
+def five_versions(project_1: Project):
     create_version("2.3.5", project_1.id)
     create_version("2.3.6", project_1.id)
     create_version("2.4.6", project_1.id)
     create_version("1.0.0", project_1.id)
     create_version("2.0.0", project_1.id)
 
+
+@pytest.mark.usefixtures("five_versions")
+def test_it_reads_first_versions_window(project_1: Project):
     # when
-    result = read_versions(project_1.id, 4)
+    result = read_versions_window(project_1.id, 4, None, "next")
 
     # then
-    assert [r.number for r in result] == ["2.4.6", "2.3.6", "2.3.5", "2.0.0"]
+    assert [r.number for r in result.versions] == ["2.4.6", "2.3.6", "2.3.5", "2.0.0"]
+    assert not result.has_previous
+    assert result.has_next
 
 
-def test_it_reads_previous_versions(project_1: Project):
-    # given
-    create_version("2.3.5", project_1.id)
-    create_version("2.3.6", project_1.id)
-    create_version("2.4.6", project_1.id)
-    create_version("1.0.0", project_1.id)
-    create_version("2.0.0", project_1.id)
+@pytest.mark.usefixtures("five_versions")
+def test_it_reads_previous_versions_window(project_1: Project):
+    # when
+    result = read_versions_window(project_1.id, 2, "2.0.0", "previous")
 
+    # then
+    assert [r.number for r in result.versions] == ["2.3.6", "2.3.5"]
+    assert result.has_previous
+    assert result.has_next
+
+
+@pytest.mark.usefixtures("five_versions")
+def test_it_reads_first_page_in_previous_direction(project_1: Project):
     # when
-    result = read_prev_versions(project_1.id, 2, "2.0.0")
+    result = read_versions_window(project_1.id, 2, "2.3.6", "previous")
 
     # then
-    assert [r.number for r in result] == ["2.3.6", "2.3.5"]
+    assert [r.number for r in result.versions] == ["2.4.6"]
+    assert not result.has_previous
+    assert result.has_next
 
 
-def test_it_reads_next_versions(project_1: Project):
-    # given
-    create_version("2.3.5", project_1.id)
-    create_version("2.3.6", project_1.id)
-    create_version("2.4.6", project_1.id)
-    create_version("1.0.0", project_1.id)
-    create_version("2.0.0", project_1.id)
+@pytest.mark.usefixtures("five_versions")
+def test_it_reads_next_versions_window(project_1: Project):
+    # when
+    result = read_versions_window(project_1.id, 3, "2.4.6", "next")
+
+    # then
+    assert [r.number for r in result.versions] == ["2.3.6", "2.3.5", "2.0.0"]
+    assert result.has_previous
+    assert result.has_next
 
+
+@pytest.mark.usefixtures("five_versions")
+def test_it_reads_last_versions_window(project_1: Project):
     # when
-    result = read_next_versions(project_1.id, 3, "2.4.6")
+    result = read_versions_window(project_1.id, 2, "2.3.5", "next")
 
     # then
-    assert [r.number for r in result] == ["2.3.6", "2.3.5", "2.0.0"]
+    assert [r.number for r in result.versions] == ["2.0.0", "1.0.0"]
+    assert result.has_previous
+    assert not result.has_next
 
 
 def test_it_reads_changes_for_version(project_1: Project):
@@ -77,15 +112,344 @@ def test_it_reads_changes_for_version(project_1: Project):
     create_change(version_2.number, project_1.id, "deprecated", "body", "Bob")
 
     # when
-    result = read_changes_for_version(version.number, project_1.id)
+    result = read_changes(version.id)
 
     # then
     assert [r.kind for r in result] == ["added", "changed", "fixed", "security"]
     assert [r.body for r in result] == ["boody", "text", "body", "body"]
 
 
-def test_read_changes_for_version_raises_error_for_missing_version():
+def test_it_reads_version(project_1: Project):
+    # given
+    version = create_version("1.0.1", project_1.id)
+
+    # when
+    result = read_version("1.0.1", project_1.id)
+
+    # then
+    assert result == version
+
+
+def test_read_version_raises_error_for_missing_version():
     # then
     with pytest.raises(VersionNotFoundError):
         # when
-        read_changes_for_version("1.2.3", uuid4())
+        read_version("1.2.3", uuid4())
+
+
+def test_it_reads_next_versions_across_number_parts(project_1: Project):
+    # given
+    create_version("10.0.0", project_1.id)
+    create_version("9.10.0", project_1.id)
+    create_version("9.9.10", project_1.id)
+    create_version("9.9.9", project_1.id)
+    create_version("0.0.2097151", project_1.id)
+
+    # when
+    result = read_versions_window(project_1.id, 5, "10.0.0", "next")
+
+    # then
+    assert [r.number for r in result.versions] == [
+        "9.10.0",
+        "9.9.10",
+        "9.9.9",
+        "0.0.2097151",
+    ]
+
+
+def test_it_reads_project_revision_of_project_without_versions(project_1: Project):
+    # when
+    result = read_project_revision(project_1.id)
+
+    # then
+    assert result.revision == 0
+    assert result.updated_at is None
+
+
+def test_it_increases_project_revision_on_every_write(project_1: Project):
+    # given
+    revisions = [read_project_revision(project_1.id).revision]
+    create_version("1.0.0", project_1.id)
+    revisions.append(read_project_revision(project_1.id).revision)
+    change = create_change("1.0.0", project_1.id, "added", "body", "Bob")
+    revisions.append(read_project_revision(project_1.id).revision)
+    delete_change("1.0.0", change.id, project_1.id)
+    revisions.append(read_project_revision(project_1.id).revision)
+
+    # when
+    release_version("1.0.0", project_1.id, date.today())
+    revisions.append(read_project_revision(project_1.id).revision)
+
+    # then
+    assert revisions == sorted(set(revisions))
+    assert read_project_revision(project_1.id).updated_at is not None
+
+
+@pytest.mark.parametrize("batch_size", [1, 2, 5, 6])
+@pytest.mark.usefixtures("five_versions")
+def test_it_iterates_versions_with_changes(project_1: Project, batch_size: int):
+    # given
+    create_change("2.3.5", project_1.id, "fixed", "body", "Bob")
+    create_change("2.3.5", project_1.id, "added", "boody", "Bob")
+    create_change("1.0.0", project_1.id, "security", "text", "Bob")
+
+    # when
+    result = list(iter_versions_with_changes(project_1.id, batch_size))
+
+    # then
+    assert [(v.number, [c.body for c in cs]) for v, cs in result] == [
+        ("2.4.6", []),
+        ("2.3.6", []),
+        ("2.3.5", ["boody", "body"]),
+        ("2.0.0", []),
+        ("1.0.0", ["text"]),
+    ]
+    assert all(c.version_id == v.id for v, cs in result for c in cs)
+
+
+def test_it_iterates_nothing_for_project_without_versions(project_1: Project):
+    # when
+    result = list(iter_versions_with_changes(project_1.id))
+
+    # then
+    assert result == []
+
+
+@pytest.mark.usefixtures("five_versions")
+def test_it_iterates_version_batches(project_1: Project):
+    # when
+    result = list(iter_version_batches(project_1.id, 2))
+
+    # then
+    assert [[v.number for v in batch] for batch in result] == [
+        ["2.4.6", "2.3.6"],
+        ["2.3.5", "2.0.0"],
+        ["1.0.0"],
+    ]
+
+
+def test_it_reads_changes_of_versions(project_1: Project):
+    # given
+    v1 = create_version("1.0.0", project_1.id)
+    v2 = create_version("2.0.0", project_1.id)
+    v3 = create_version("3.0.0", project_1.id)
+    create_change("1.0.0", project_1.id, "fixed", "body", "Bob")
+    create_change("1.0.0", project_1.id, "added", "boody", "Bob")
+    create_change("2.0.0", project_1.id, "security", "text", "Bob")
+
+    # when
+    result = read_changes_of_versions([v1.id, v3.id])
+
+    # then
+    assert list(result) == [v1.id]
+    assert [c.body for c in result[v1.id]] == ["boody", "body"]
+    assert read_changes_of_versions([]) == {}
+    assert [c.body for c in read_changes_of_versions([v2.id])[v2.id]] == ["text"]
+
+
+@pytest.mark.usefixtures("five_versions")
+def test_it_reads_versions_by_number(project_1: Project):
+    # when
+    result = read_versions_by_number(project_1.id, ["1.0.0", "2.4.6", "1.0.0"])
+
+    # then
+    assert [v.number for v in result] == ["2.4.6", "1.0.0"]
+
+
+@pytest.mark.usefixtures("five_versions")
+def test_read_versions_by_number_raises_error_for_missing_version(project_1: Project):
+    # then
+    with pytest.raises(VersionNotFoundError):
+        # when
+        read_versions_by_number(project_1.id, ["1.0.0", "3.0.0"])
+
+
+@pytest.mark.parametrize("batch_size", [1, 2, 3])
+@pytest.mark.usefixtures("five_versions")
+def test_it_iterates_versions_with_changes_in_range(
+    project_1: Project, batch_size: int
+):
+    # given
+    create_change("2.3.5", project_1.id, "fixed", "body", "Bob")
+
+    # when
+    result = list(
+        iter_versions_with_changes(project_1.id, batch_size, "2.0.0", "2.3.6")
+    )
+
+    # then
+    assert [(v.number, [c.body for c in cs]) for v, cs in result] == [
+        ("2.3.6", []),
+        ("2.3.5", ["body"]),
+    ]
+
+
+@pytest.mark.usefixtures("five_versions")
+def test_it_reads_versions_window_in_range(project_1: Project):
+    # given
+    version_range = VersionRange(to_number_key("2.0.0"), to_number_key("2.3.6"))
+
+    # when
+    first = read_versions_window(project_1.id, 2, None, "next", version_range)
+    second = read_versions_window(project_1.id, 2, "2.3.5", "next", version_range)
+
+    # then
+    assert [r.number for r in first.versions] == ["2.3.6", "2.3.5"]
+    assert not first.has_previous
+    assert first.has_next
+    assert [r.number for r in second.versions] == ["2.0.0"]
+    assert second.has_previous
+    assert not second.has_next
+
+
+def test_it_reads_latest_versions(project_1: Project):
+    # given
+    create_version("1.0.0", project_1.id)
+    create_version("2.0.0", project_1.id)
+    create_version("1.5.0", project_1.id)
+    release_version("1.5.0", project_1.id, date.today())
+    release_version("1.0.0", project_1.id, date.today())
+    delete_version("2.0.0", project_1.id)
+
+    # when
+    latest = read_latest_version(project_1.id)
+    released = read_latest_version(project_1.id, released=True)
+
+    # then
+    assert latest.number == "1.5.0"
+    assert released.number == "1.5.0"
+
+
+def test_read_latest_version_raises_error_without_released_version(
+    project_1: Project,
+):
+    # given
+    create_version("1.0.0", project_1.id)
+
+    # then
+    with pytest.raises(VersionNotFoundError):
+        # when
+        read_latest_version(project_1.id, released=True)
+
+
+def test_it_reads_release_window(project_1: Project):
+    # given
+    for number, released_at in [
+        ("1.0.0", date(2024, 6, 30)),
+        ("1.1.0", date(2024, 7, 1)),
+        ("1.2.0", date(2024, 8, 1)),
+        ("1.3.0", date(2024, 8, 1)),
+        ("2.0.0", date(2024, 10, 1)),
+    ]:
+        create_version(number, project_1.id)
+        release_version(number, project_1.id, released_at)
+    create_version("3.0.0", project_1.id)
+    q3 = (date(2024, 7, 1), date(2024, 9, 30))
+
+    # when
+    first = read_release_window(project_1.id, 2, None, "next", q3)
+    second = read_release_window(
+        project_1.id, 2, (date(2024, 8, 1), "1.2.0"), "next", q3
+    )
+
+    # then
+    assert [v.number for v in first.versions] == ["1.3.0", "1.2.0"]
+    assert not first.has_previous
+    assert first.has_next
+    assert [v.number for v in second.versions] == ["1.1.0"]
+    assert second.has_previous
+    assert not second.has_next
+
+
+def test_it_counts_changes_of_versions(project_1: Project):
+    # given
+    v1 = create_version("1.0.0", project_1.id)
+    v2 = create_version("2.0.0", project_1.id)
+    create_change("1.0.0", project_1.id, "added", "body", "Bob")
+    create_change("1.0.0", project_1.id, "added", "boody", "Bob")
+    create_change("1.0.0", project_1.id, "security", "text", "Bob")
+
+    # when
+    result = count_changes_of_versions([v1.id, v2.id])
+
+    # then
+    assert result == {v1.id: {"added": 2, "security": 1}}
+    assert count_changes_of_versions([]) == {}
+
+
+def test_it_reads_monthly_rollups(project_1: Project):
+    # given
+    for number in ["1.0.0", "1.1.0", "2.0.0", "3.0.0"]:
+        create_version(number, project_1.id)
+    create_change("1.0.0", project_1.id, "added", "body", "Bob")
+    moved = create_change("3.0.0", project_1.id, "security", "body", "Bob")
+    create_change("2.0.0", project_1.id, "fixed", "body", "Bob")
+    release_version("1.0.0", project_1.id, date(2024, 7, 3))
+    release_version("1.1.0", project_1.id, date(2024, 7, 20))
+    move_change_to_other_version("3.0.0", "2.0.0", project_1.id, moved.id)
+    release_version("2.0.0", project_1.id, date(2024, 9, 1))
+    delete_version("3.0.0", project_1.id)
+
+    # when
+    result = read_monthly_rollups(project_1.id)
+
+    # then
+    assert [(r.month, r.releases, r.changes) for r in result] == [
+        ("2024-07", 2, {"added": 1}),
+        ("2024-09", 1, {"fixed": 1, "security": 1}),
+    ]
+
+
+def test_it_reads_changes_window_by_kind(project_1: Project):
+    # given
+    for number in ["1.0.0", "2.0.0", "3.0.0"]:
+        create_version(number, project_1.id)
+    create_change("1.0.0", project_1.id, "fixed", "one", "Bob")
+    create_change("2.0.0", project_1.id, "added", "two", "Bob")
+    create_change("2.0.0", project_1.id, "fixed", "three", "Bob")
+    moved = create_change("3.0.0", project_1.id, "fixed", "four", "Bob")
+    move_change_to_other_version("3.0.0", "1.0.0", project_1.id, moved.id)
+
+    # when
+    first = read_changes_window(project_1.id, 2, None, "next", kind="fixed")
+    last = first.changes[-1]
+    second = read_changes_window(
+        project_1.id, 2, (last.version_number, last.id), "next", kind="fixed"
+    )
+
+    # then
+    assert [c.version_number for c in first.changes] == ["2.0.0", "1.0.0"]
+    assert first.changes[0].body == "three"
+    assert not first.has_previous
+    assert first.has_next
+    assert [c.version_number for c in second.changes] == ["1.0.0"]
+    assert {c.body for c in first.changes[1:] + second.changes} == {"one", "four"}
+    assert second.has_previous
+    assert not second.has_next
+
+
+def test_it_reads_previous_changes_window_by_kind_and_author(project_1: Project):
+    # given
+    for number in ["1.0.0", "2.0.0", "3.0.0"]:
+        create_version(number, project_1.id)
+    create_change("1.0.0", project_1.id, "added", "one", "Bob")
+    create_change("2.0.0", project_1.id, "added", "two", "Bob")
+    create_change("2.0.0", project_1.id, "added", "three", "Alice")
+    create_change("3.0.0", project_1.id, "fixed", "four", "Bob")
+    first = create_change("3.0.0", project_1.id, "added", "five", "Bob")
+
+    # when
+    result = read_changes_window(
+        project_1.id, 1, ("1.0.0", UUID(int=(1 << 128) - 1)), "previous", "added", "Bob"
+    )
+    newest = read_changes_window(
+        project_1.id, 5, ("2.0.0", result.changes[0].id), "previous", "added", "Bob"
+    )
+
+    # then
+    assert [c.body for c in result.changes] == ["two"]
+    assert result.has_previous
+    assert result.has_next
+    assert [c.id for c in newest.changes] == [first.id]
+    assert not newest.has_previous
+    assert newest.has_next
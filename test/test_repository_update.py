@@ -101,8 +101,8 @@ def test_it_moves_no_released_version_change_to_other_version(project_1: Project
     create_version(version_number_1, project_1.id)
     version_number_2 = "2.3.5"
     create_version(version_number_2, project_1.id)
-    release_version(version_number_1, project_1.id, date.today())
     change = create_change(version_number_1, project_1.id, "added", "body", "Bob")
+    release_version(version_number_1, project_1.id, date.today())
 
     # then
     with pytest.raises(VersionReleasedError):
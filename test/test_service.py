@@ -1,27 +1,44 @@
-from datetime import date
+from datetime import UTC, date, datetime
 from unittest.mock import Mock
 from uuid import uuid4
 
 import pytest
 from pytest_mock import MockerFixture
 from realerikrani.base64token import encode
+from realerikrani.project import Project, ProjectNotFoundError, project_repo
 
 from e1004.changelog_api import repository, service
 from e1004.changelog_api.error import (
     ChangeAuthorInvalidError,
     ChangeBodyInvalidError,
     ChangeKindInvalidError,
+    ChangesReadingTokenInvalidError,
+    VersionNotFoundError,
     VersionNumberInvalidError,
+    VersionRangeInvalidError,
     VersionReleasedAtError,
     VersionsReadingTokenInvalidError,
 )
-from e1004.changelog_api.model import Change, Version
-from e1004.changelog_api.service import validate_released_at, validate_version_number
+from e1004.changelog_api.model import (
+    Change,
+    ChangesWindow,
+    MonthlyRollup,
+    ProjectChange,
+    ProjectRevision,
+    Version,
+    VersionRange,
+    VersionsWindow,
+)
+from e1004.changelog_api.service import (
+    validate_released_at,
+    validate_version_number,
+    validate_version_range,
+)
 
 _VERSION_1 = Mock(autospec=Version, number="1.0.1")
 _VERSION_2 = Mock(autospec=Version, number="2.0.1")
-_VERSION_3 = Mock(autospec=Version)
 _CHANGE_1 = Mock(autospec=Change, kind="added", body="body")
+_REVISION = ProjectRevision(uuid4(), 3, datetime(2024, 5, 1, tzinfo=UTC))
 
 
 def test_it_raises_error_for_invalid_version_number():
@@ -100,7 +117,11 @@ def test_it_reads_no_versions(mocker: MockerFixture):
     # given
     project_id = uuid4()
     page_size = 3
-    read_versions = mocker.patch.object(repository, "read_versions", return_value=[])
+    read_window = mocker.patch.object(
+        repository,
+        "read_versions_window",
+        return_value=VersionsWindow([], has_previous=False, has_next=False),
+    )
 
     # when
     result = service.read_versions(project_id, page_size, None)
@@ -109,7 +130,7 @@ def test_it_reads_no_versions(mocker: MockerFixture):
     assert result.next_token is None
     assert result.prev_token is None
     assert result.versions == []
-    read_versions.assert_called_once_with(project_id, page_size + 1)
+    read_window.assert_called_once_with(project_id, page_size, None, "next", None)
 
 
 def test_it_reads_versions_with_next_page_without_token(mocker: MockerFixture):
@@ -117,10 +138,9 @@ def test_it_reads_versions_with_next_page_without_token(mocker: MockerFixture):
     project_id = uuid4()
     page_size = 1
     mocker.patch.object(
-        repository, "read_versions", return_value=[_VERSION_1, _VERSION_2]
-    )
-    read_prev_versions = mocker.patch.object(
-        repository, "read_prev_versions", return_value=[]
+        repository,
+        "read_versions_window",
+        return_value=VersionsWindow([_VERSION_1], has_previous=False, has_next=True),
     )
 
     # when
@@ -132,17 +152,20 @@ def test_it_reads_versions_with_next_page_without_token(mocker: MockerFixture):
     )
     assert result.prev_token is None
     assert result.versions == [_VERSION_1]
-    read_prev_versions.assert_called_once_with(project_id, 1, _VERSION_1.number)
 
 
-def test_it_reads_versions_with_next_page_previous_direction(mocker: MockerFixture):
+def test_it_reads_versions_with_next_and_prev_page(mocker: MockerFixture):
     # given
     project_id = uuid4()
-    page_size = 1
-    token = encode([("version_number", ""), ("direction", "previous")])
-
-    mocker.patch.object(repository, "read_prev_versions", return_value=[_VERSION_1])
-    mocker.patch.object(repository, "read_next_versions", return_value=[_VERSION_3])
+    page_size = 2
+    token = encode([("version_number", "3.0.0"), ("direction", "next")])
+    read_window = mocker.patch.object(
+        repository,
+        "read_versions_window",
+        return_value=VersionsWindow(
+            [_VERSION_2, _VERSION_1], has_previous=True, has_next=True
+        ),
+    )
 
     # when
     result = service.read_versions(project_id, page_size, token)
@@ -151,40 +174,60 @@ def test_it_reads_versions_with_next_page_previous_direction(mocker: MockerFixtu
     assert result.next_token == encode(
         [("version_number", _VERSION_1.number), ("direction", "next")]
     )
-    assert result.prev_token is None
-    assert result.versions == [_VERSION_1]
+    assert result.prev_token == encode(
+        [("version_number", _VERSION_2.number), ("direction", "previous")]
+    )
+    assert result.versions == [_VERSION_2, _VERSION_1]
+    read_window.assert_called_once_with(project_id, page_size, "3.0.0", "next", None)
 
 
-def test_it_reads_versions_with_next_and_prev_page_without_token(mocker: MockerFixture):
+def test_it_reads_versions_with_previous_direction(mocker: MockerFixture):
     # given
     project_id = uuid4()
     page_size = 1
-    mocker.patch.object(
-        repository, "read_versions", return_value=[_VERSION_1, _VERSION_2]
-    )
-    read_prev_versions = mocker.patch.object(
-        repository, "read_prev_versions", return_value=[_VERSION_3]
+    token = encode([("version_number", "1.0.0"), ("direction", "previous")])
+    read_window = mocker.patch.object(
+        repository,
+        "read_versions_window",
+        return_value=VersionsWindow([_VERSION_2], has_previous=True, has_next=False),
     )
 
     # when
-    result = service.read_versions(project_id, page_size, None)
+    result = service.read_versions(project_id, page_size, token)
 
     # then
-    assert result.next_token == encode(
-        [("version_number", _VERSION_1.number), ("direction", "next")]
-    )
+    assert result.next_token is None
     assert result.prev_token == encode(
-        [("version_number", _VERSION_1.number), ("direction", "previous")]
+        [("version_number", _VERSION_2.number), ("direction", "previous")]
     )
-    assert result.versions == [_VERSION_1]
-    read_prev_versions.assert_called_once_with(project_id, 1, _VERSION_1.number)
+    assert result.versions == [_VERSION_2]
+    read_window.assert_called_once_with(
+        project_id, page_size, "1.0.0", "previous", None
+    )
+
+
+def test_it_reads_versions_without_tokens_for_empty_page(mocker: MockerFixture):
+    # given
+    token = encode([("version_number", "1.0.0"), ("direction", "next")])
+    mocker.patch.object(
+        repository,
+        "read_versions_window",
+        return_value=VersionsWindow([], has_previous=True, has_next=False),
+    )
+
+    # when
+    result = service.read_versions(uuid4(), 1, token)
+
+    # then
+    assert result.next_token is None
+    assert result.prev_token is None
 
 
 def test_it_raises_error_for_unexpected_direction():
     # given
     project_id = uuid4()
     page_size = 3
-    token = encode([("version_number", ""), ("direction", "")])
+    token = encode([("version_number", "1.0.0"), ("direction", "")])
 
     # then
     with pytest.raises(VersionsReadingTokenInvalidError):
@@ -205,7 +248,12 @@ def test_it_raises_error_for_invalid_token():
 
 
 @pytest.mark.parametrize(
-    "token", [encode([("direction", "next")]), encode([("version_number", "")])]
+    "token",
+    [
+        encode([("direction", "next")]),
+        encode([("version_number", "1.0.0")]),
+        encode([("version_number", "1.0"), ("direction", "next")]),
+    ],
 )
 def test_it_raises_error_for_missing_token_fields(token: str):
     # given
@@ -218,45 +266,6 @@ def test_it_raises_error_for_missing_token_fields(token: str):
         service.read_versions(project_id, page_size, token)
 
 
-def test_it_reads_versions_with_no_previous_versions(mocker: MockerFixture):
-    # given
-    project_id = uuid4()
-    page_size = 1
-    token = encode([("version_number", ""), ("direction", "next")])
-
-    mocker.patch.object(repository, "read_prev_versions", return_value=[])
-    mocker.patch.object(repository, "read_next_versions", return_value=[_VERSION_1])
-
-    # when
-    result = service.read_versions(project_id, page_size, token)
-
-    # then
-    assert result.next_token is None
-    assert result.versions == [_VERSION_1]
-
-
-def test_it_reads_versions_with_previous_direction(mocker: MockerFixture):
-    # given
-    project_id = uuid4()
-    page_size = 1
-    token = encode([("version_number", ""), ("direction", "previous")])
-
-    mocker.patch.object(
-        repository, "read_prev_versions", return_value=[_VERSION_1, _VERSION_2]
-    )
-    mocker.patch.object(repository, "read_next_versions", return_value=[])
-
-    # when
-    result = service.read_versions(project_id, page_size, token)
-
-    # then
-    assert result.next_token is None
-    assert result.prev_token == encode(
-        [("version_number", _VERSION_2.number), ("direction", "previous")]
-    )
-    assert result.versions == [_VERSION_2]
-
-
 @pytest.mark.parametrize(
     "kind", ["added", "changed", "fixed", "removed", "deprecated", "security"]
 )
@@ -278,6 +287,25 @@ def test_it_creates_change(mocker: MockerFixture, kind: str, body: str, author:
     )
 
 
+def test_it_creates_changes(mocker: MockerFixture):
+    # given
+    create_changes = mocker.patch.object(repository, "create_changes")
+    project_id = uuid4()
+    changes = [("added", "a", "Bob"), ("fixed", "b", "Alice")]
+
+    # when
+    result = service.create_changes("1.2.3", project_id, changes)
+
+    # then
+    assert result == create_changes.return_value
+    create_changes.assert_called_once_with("1.2.3", project_id, changes)
+
+
+def test_create_changes_raises_error_for_invalid_change():
+    with pytest.raises(ChangeBodyInvalidError):
+        service.create_changes("1.2.3", uuid4(), [("added", "", "Bob")])
+
+
 def test_create_change_raises_error_for_invalid_kind():
     with pytest.raises(ChangeKindInvalidError):
         service.create_change("1.2.3", uuid4(), "kind", "body", "Bob")
@@ -297,6 +325,7 @@ def test_create_change_raises_error_for_invalid_author(author: str):
 
 def test_it_deletes_change(mocker: MockerFixture):
     # given
+    unit_of_work = mocker.patch.object(repository, "unit_of_work")
     delete_change = mocker.patch.object(repository, "delete_change")
     version_number = "1.2.3"
     project_id = uuid4()
@@ -308,6 +337,7 @@ def test_it_deletes_change(mocker: MockerFixture):
     # then
     assert result == delete_change.return_value
     delete_change.assert_called_once_with(version_number, change_id, project_id)
+    unit_of_work.assert_called_once_with(write=True)
 
 
 def test_delete_change_raises_error_for_invalid_version_number():
@@ -315,25 +345,109 @@ def test_delete_change_raises_error_for_invalid_version_number():
         service.delete_change("1.2", uuid4(), uuid4())
 
 
-def test_it_reads_change(mocker: MockerFixture):
+def test_it_reads_changes_for_version(mocker: MockerFixture):
     # given
     version_number = "1.2.3"
     project_id = uuid4()
-    reader = mocker.patch.object(
-        repository, "read_changes_for_version", return_value=[_CHANGE_1]
-    )
+    version = Version(date.today(), project_id, version_number, uuid4(), None)
+    read_version = mocker.patch.object(repository, "read_version", return_value=version)
+    reader = mocker.patch.object(repository, "read_changes", return_value=[_CHANGE_1])
 
     # when
-    result = service.read_changes_for_version(version_number, project_id)
+    result = service.read_changes_for_version(version_number, project_id, _REVISION)
 
     # then
     assert result == [_CHANGE_1]
-    reader.assert_called_once_with(version_number, project_id)
+    read_version.assert_called_once_with(version_number, project_id)
+    reader.assert_called_once_with(version.id)
+
+
+def test_it_caches_changes_of_released_version(mocker: MockerFixture):
+    # given
+    version_number = "1.2.3"
+    project_id = uuid4()
+    version = Version(date.today(), project_id, version_number, uuid4(), date.today())
+    mocker.patch.object(repository, "read_version", return_value=version)
+    reader = mocker.patch.object(repository, "read_changes", return_value=[_CHANGE_1])
+    service.read_changes_for_version(version_number, project_id, _REVISION)
+
+    # when
+    result = service.read_changes_for_version(version_number, project_id, _REVISION)
+
+    # then
+    assert result == [_CHANGE_1]
+    reader.assert_called_once_with(version.id)
+
+
+def test_it_forgets_cached_changes_of_deleted_project(mocker: MockerFixture):
+    # given
+    version_number = "1.2.3"
+    project_id = uuid4()
+    version = Version(date.today(), project_id, version_number, uuid4(), date.today())
+    mocker.patch.object(repository, "read_version", return_value=version)
+    reader = mocker.patch.object(repository, "read_changes", return_value=[_CHANGE_1])
+    service.read_changes_for_version(version_number, project_id, _REVISION)
+
+    # when
+    service.forget_project(project_id)
+
+    # then
+    service.read_changes_for_version(version_number, project_id, _REVISION)
+    assert reader.call_count == 2
+
+
+def test_it_reads_no_cached_changes_of_project_without_revision(
+    mocker: MockerFixture,
+):
+    # given
+    version_number = "1.2.3"
+    project_id = uuid4()
+    version = Version(date.today(), project_id, version_number, uuid4(), date.today())
+    mocker.patch.object(repository, "read_version", return_value=version)
+    reader = mocker.patch.object(repository, "read_changes", return_value=[_CHANGE_1])
+    service.read_changes_for_version(version_number, project_id, _REVISION)
+    mocker.patch.object(repository, "read_version", side_effect=VersionNotFoundError)
+
+    # then
+    with pytest.raises(VersionNotFoundError):
+        # when
+        service.read_changes_for_version(
+            version_number, project_id, ProjectRevision(project_id, 0, None)
+        )
+    reader.assert_called_once_with(version.id)
+
+
+def test_it_caches_project_name(mocker: MockerFixture):
+    # given
+    project = Project("name", uuid4())
+    reader = mocker.patch.object(project_repo, "read_project", return_value=project)
+    service.read_project_name(project.id)
+
+    # when
+    result = service.read_project_name(project.id)
+
+    # then
+    assert result == "name"
+    reader.assert_called_once_with(project.id)
+
+
+def test_it_forgets_project_name_of_deleted_project(mocker: MockerFixture):
+    # given
+    project = Project("name", uuid4())
+    reader = mocker.patch.object(project_repo, "read_project", return_value=project)
+    service.read_project_name(project.id)
+    service.forget_project(project.id)
+    reader.side_effect = ProjectNotFoundError
+
+    # then
+    with pytest.raises(ProjectNotFoundError):
+        # when
+        service.read_project_name(project.id)
 
 
 def test_reading_version_changes_raises_error_for_invalid_version_number():
     with pytest.raises(VersionNumberInvalidError):
-        service.read_changes_for_version("1.2", uuid4())
+        service.read_changes_for_version("1.2", uuid4(), _REVISION)
 
 
 def test_it_moves_change_to_other_version(mocker: MockerFixture):
@@ -342,6 +456,7 @@ def test_it_moves_change_to_other_version(mocker: MockerFixture):
     version_number_2 = "2.2.3"
     project_id = uuid4()
     change_id = uuid4()
+    unit_of_work = mocker.patch.object(repository, "unit_of_work")
     mover = mocker.patch.object(
         repository, "move_change_to_other_version", return_value=[_CHANGE_1]
     )
@@ -356,9 +471,433 @@ def test_it_moves_change_to_other_version(mocker: MockerFixture):
     mover.assert_called_once_with(
         version_number_1, version_number_2, project_id, change_id
     )
+    unit_of_work.assert_called_once_with(write=True)
 
 
 @pytest.mark.parametrize(("from_v", "to_v"), [("1.1.1", ""), ("", "2.2.2")])
 def test_move_change_to_other_version_raises_error(from_v: str, to_v: str):
     with pytest.raises(VersionNumberInvalidError):
         service.move_change_to_other_version(from_v, to_v, uuid4(), uuid4())
+
+
+def test_it_raises_error_for_too_large_version_number_part():
+    # given
+    number = "1.2097152.0"
+
+    # then
+    with pytest.raises(VersionNumberInvalidError):
+        # when
+        validate_version_number(number)
+
+
+def test_it_imports_changelog_in_batches(mocker: MockerFixture):
+    # given
+    import_versions = mocker.patch.object(
+        repository, "import_versions", side_effect=[(1, 1), (1, 0)]
+    )
+    lines = ["## [1.1.0] - 2024-02-01", "### Fixed", "- bug", "## [1.0.0]"]
+    project_id = uuid4()
+
+    # when
+    result = [
+        (p.versions, p.changes, p.skipped_versions)
+        for p in service.import_changelog(project_id, lines, "Bob", batch_rows=2)
+    ]
+
+    # then
+    assert result == [(1, 1, 0), (2, 1, 0)]
+    assert import_versions.call_args_list[0].args == (
+        project_id,
+        [("1.1.0", date(2024, 2, 1), [("fixed", "bug", "Bob")])],
+    )
+    assert import_versions.call_args_list[1].args == (
+        project_id,
+        [("1.0.0", None, [])],
+    )
+
+
+@pytest.mark.parametrize(
+    ("line", "error"),
+    [
+        ("## [1.0.0-rc.1] - 2024-01-01", VersionNumberInvalidError),
+        ("## [0.9.0.1]", VersionNumberInvalidError),
+        ("## [1.0.0] - 2024-1-1", VersionReleasedAtError),
+    ],
+)
+def test_it_imports_no_changelog_with_invalid_heading(
+    mocker: MockerFixture, line: str, error: type[Exception]
+):
+    # given
+    import_versions = mocker.patch.object(repository, "import_versions")
+
+    # then
+    with pytest.raises(error):
+        # when
+        list(service.import_changelog(uuid4(), [line, "### Added", "- a"], "Bob"))
+    import_versions.assert_not_called()
+
+
+def test_it_exports_changelog(mocker: MockerFixture):
+    # given
+    iterate = mocker.patch.object(repository, "iter_versions_with_changes")
+    project_id = uuid4()
+
+    # when
+    result = service.export_changelog(project_id)
+
+    # then
+    iterate.assert_called_once_with(project_id)
+    assert result == iterate.return_value
+
+
+def test_it_renders_changelog_with_cached_released_sections(mocker: MockerFixture):
+    # given
+    project_id = uuid4()
+    released = Version(date.today(), project_id, "1.0.0", uuid4(), date(2024, 1, 2))
+    unreleased = Version(date.today(), project_id, "2.0.0", uuid4(), None)
+    change = Change(uuid4(), released.id, "body", "added", "Bob")
+    mocker.patch.object(
+        repository,
+        "iter_version_batches",
+        side_effect=lambda _: iter([[unreleased, released]]),
+    )
+    reader = mocker.patch.object(
+        repository, "read_changes_of_versions", return_value={released.id: [change]}
+    )
+    first = "".join(service.render_changelog(project_id))
+
+    # when
+    result = "".join(service.render_changelog(project_id))
+
+    # then
+    assert result == first
+    assert "## [1.0.0] - 2024-01-02\n\n### Added\n\n- body\n" in result
+    assert reader.call_args_list[0].args == ([unreleased.id, released.id],)
+    assert reader.call_args_list[1].args == ([unreleased.id],)
+
+
+def test_it_reads_versions_with_changes(mocker: MockerFixture):
+    # given
+    project_id = uuid4()
+    v1 = Version(date.today(), project_id, "1.0.0", uuid4(), None)
+    v2 = Version(date.today(), project_id, "2.0.0", uuid4(), None)
+    change = Change(uuid4(), v1.id, "body", "added", "Bob")
+    mocker.patch.object(repository, "unit_of_work")
+    mocker.patch.object(
+        repository,
+        "read_versions_window",
+        return_value=VersionsWindow([v2, v1], has_previous=False, has_next=False),
+    )
+    reader = mocker.patch.object(
+        repository, "read_changes_of_versions", return_value={v1.id: [change]}
+    )
+
+    # when
+    result = service.read_versions_with_changes(project_id, 2, None)
+
+    # then
+    assert [v.number for v in result.versions] == ["2.0.0", "1.0.0"]
+    assert [v.changes for v in result.versions] == [[], [change]]
+    assert result.versions[1].id == v1.id
+    reader.assert_called_once_with([v2.id, v1.id])
+
+
+def test_it_reads_changes_for_versions(mocker: MockerFixture):
+    # given
+    project_id = uuid4()
+    v1 = Version(date.today(), project_id, "1.0.0", uuid4(), None)
+    v2 = Version(date.today(), project_id, "1.0.1", uuid4(), None)
+    change = Change(uuid4(), v1.id, "body", "added", "Bob")
+    mocker.patch.object(repository, "unit_of_work")
+    read_versions = mocker.patch.object(
+        repository, "read_versions_by_number", return_value=[v2, v1]
+    )
+    mocker.patch.object(
+        repository, "read_changes_of_versions", return_value={v1.id: [change]}
+    )
+
+    # when
+    result = service.read_changes_for_versions(["1.0.0", "1.0.1"], project_id)
+
+    # then
+    assert result == {"1.0.1": [], "1.0.0": [change]}
+    read_versions.assert_called_once_with(project_id, ["1.0.0", "1.0.1"])
+
+
+def test_reading_changes_for_versions_raises_error_for_invalid_number():
+    with pytest.raises(VersionNumberInvalidError):
+        service.read_changes_for_versions(["1.0.0", "1.0"], uuid4())
+
+
+def test_it_reads_changes_between_versions(mocker: MockerFixture):
+    # given
+    iterate = mocker.patch.object(repository, "iter_versions_with_changes")
+    project_id = uuid4()
+
+    # when
+    result = service.read_changes_between(project_id, "1.2.0", "1.9.3")
+
+    # then
+    iterate.assert_called_once_with(project_id, after="1.2.0", through="1.9.3")
+    assert result == iterate.return_value
+
+
+@pytest.mark.parametrize(("after", "through"), [("1.2", None), ("1.2.0", "1.9")])
+def test_reading_changes_between_raises_error_for_invalid_number(
+    after: str, through: str | None
+):
+    with pytest.raises(VersionNumberInvalidError):
+        service.read_changes_between(uuid4(), after, through)
+
+
+@pytest.mark.parametrize(
+    ("expression", "lowest", "highest"),
+    [
+        (">=1.4.0,<2.0.0", "1.4.0", "1.2097151.2097151"),
+        ("2.x", "2.0.0", "2.2097151.2097151"),
+        ("=2.3.*", "2.3.0", "2.3.2097151"),
+        ("<=2.1", "0.0.0", "2.1.2097151"),
+        (" > 1.0.0 , < 1.1 ", "1.0.1", "1.0.2097151"),
+        ("1.2.3", "1.2.3", "1.2.3"),
+    ],
+)
+def test_it_compiles_version_range(expression: str, lowest: str, highest: str):
+    # when
+    result = validate_version_range(expression)
+
+    # then
+    assert result == VersionRange(
+        repository.to_number_key(lowest), repository.to_number_key(highest)
+    )
+
+
+@pytest.mark.parametrize(
+    "expression",
+    ["", "1.2.3.x", "~1.2.0", ">=2.0.0,<1.0.0", "<0.0.0", "2097152.x", "1.0.0,"],
+)
+def test_it_raises_error_for_invalid_version_range(expression: str):
+    with pytest.raises(VersionRangeInvalidError):
+        validate_version_range(expression)
+
+
+def test_it_reads_versions_in_range(mocker: MockerFixture):
+    # given
+    project_id = uuid4()
+    read_window = mocker.patch.object(
+        repository,
+        "read_versions_window",
+        return_value=VersionsWindow([_VERSION_1], has_previous=False, has_next=False),
+    )
+
+    # when
+    service.read_versions(project_id, 3, None, "1.x")
+
+    # then
+    read_window.assert_called_once_with(
+        project_id,
+        3,
+        None,
+        "next",
+        VersionRange(
+            repository.to_number_key("1.0.0"),
+            repository.to_number_key("1.2097151.2097151"),
+        ),
+    )
+
+
+@pytest.mark.parametrize("released", [False, True])
+def test_it_reads_latest_version(mocker: MockerFixture, released: bool):  # noqa: FBT001
+    # given
+    read_latest = mocker.patch.object(repository, "read_latest_version")
+    project_id = uuid4()
+
+    # when
+    result = service.read_latest_version(project_id, released=released)
+
+    # then
+    read_latest.assert_called_once_with(project_id, released=released)
+    assert result == read_latest.return_value
+
+
+def test_it_reads_versions_released_between(mocker: MockerFixture):
+    # given
+    project_id = uuid4()
+    version = Version(date.today(), project_id, "1.1.0", uuid4(), date(2024, 8, 1))
+    read_window = mocker.patch.object(
+        repository,
+        "read_release_window",
+        return_value=VersionsWindow([version], has_previous=True, has_next=False),
+    )
+    token = encode(
+        [
+            ("version_number", "1.2.0"),
+            ("direction", "next"),
+            ("released_at", "2024-08-02"),
+        ]
+    )
+
+    # when
+    result = service.read_versions(project_id, 1, token, None, (None, "2024-09-30"))
+
+    # then
+    read_window.assert_called_once_with(
+        project_id,
+        1,
+        (date(2024, 8, 2), "1.2.0"),
+        "next",
+        (date.min, date(2024, 9, 30)),
+        None,
+    )
+    assert result.prev_token == encode(
+        [
+            ("version_number", "1.1.0"),
+            ("direction", "previous"),
+            ("released_at", "2024-08-01"),
+        ]
+    )
+
+
+def test_reading_versions_released_between_raises_error_for_token_without_date():
+    # given
+    token = encode([("version_number", "1.2.0"), ("direction", "next")])
+
+    # then
+    with pytest.raises(VersionsReadingTokenInvalidError):
+        # when
+        service.read_versions(uuid4(), 1, token, None, ("2024-07-01", None))
+
+
+def test_it_reads_versions_with_change_counts(mocker: MockerFixture):
+    # given
+    project_id = uuid4()
+    v1 = Version(date.today(), project_id, "1.0.0", uuid4(), None)
+    v2 = Version(date.today(), project_id, "2.0.0", uuid4(), None)
+    mocker.patch.object(repository, "unit_of_work")
+    mocker.patch.object(
+        repository,
+        "read_versions_window",
+        return_value=VersionsWindow([v2, v1], has_previous=False, has_next=False),
+    )
+    counter = mocker.patch.object(
+        repository, "count_changes_of_versions", return_value={v1.id: {"fixed": 3}}
+    )
+
+    # when
+    result = service.read_versions_with_change_counts(project_id, 2, None)
+
+    # then
+    assert [v.change_counts["fixed"] for v in result.versions] == [0, 3]
+    assert set(result.versions[0].change_counts) == {
+        "added",
+        "changed",
+        "deprecated",
+        "removed",
+        "fixed",
+        "security",
+    }
+    counter.assert_called_once_with([v2.id, v1.id])
+
+
+def test_it_reads_monthly_rollups_with_every_kind(mocker: MockerFixture):
+    # given
+    project_id = uuid4()
+    mocker.patch.object(
+        repository,
+        "read_monthly_rollups",
+        return_value=[MonthlyRollup("2024-07", 2, {"security": 1})],
+    )
+
+    # when
+    result = service.read_monthly_rollups(project_id)
+
+    # then
+    assert result == [
+        MonthlyRollup(
+            "2024-07",
+            2,
+            {
+                "added": 0,
+                "changed": 0,
+                "deprecated": 0,
+                "removed": 0,
+                "fixed": 0,
+                "security": 1,
+            },
+        )
+    ]
+
+
+def test_it_reads_project_changes_with_next_and_prev_page(mocker: MockerFixture):
+    # given
+    project_id = uuid4()
+    cursor_id = uuid4()
+    token = encode(
+        [
+            ("version_number", "3.0.0"),
+            ("change_id", str(cursor_id)),
+            ("direction", "next"),
+        ]
+    )
+    change_1 = ProjectChange(uuid4(), uuid4(), "body", "fixed", "Bob", "2.0.0")
+    change_2 = ProjectChange(uuid4(), uuid4(), "body", "fixed", "Bob", "1.0.0")
+    read_window = mocker.patch.object(
+        repository,
+        "read_changes_window",
+        return_value=ChangesWindow(
+            [change_1, change_2], has_previous=True, has_next=True
+        ),
+    )
+
+    # when
+    result = service.read_project_changes(project_id, 2, token, kind="fixed")
+
+    # then
+    assert result.changes == [change_1, change_2]
+    assert result.prev_token == encode(
+        [
+            ("version_number", "2.0.0"),
+            ("change_id", str(change_1.id)),
+            ("direction", "previous"),
+        ]
+    )
+    assert result.next_token == encode(
+        [
+            ("version_number", "1.0.0"),
+            ("change_id", str(change_2.id)),
+            ("direction", "next"),
+        ]
+    )
+    read_window.assert_called_once_with(
+        project_id, 2, ("3.0.0", cursor_id), "next", "fixed", None
+    )
+
+
+@pytest.mark.parametrize(
+    "token",
+    [
+        "",
+        encode([("version_number", "1.0.0"), ("direction", "next")]),
+        encode(
+            [("version_number", "1.0.0"), ("change_id", "x"), ("direction", "next")]
+        ),
+        encode(
+            [
+                ("version_number", "1.0.0"),
+                ("change_id", str(uuid4())),
+                ("direction", ""),
+            ]
+        ),
+    ],
+)
+def test_it_raises_error_for_invalid_changes_token(token: str):
+    # then
+    with pytest.raises(ChangesReadingTokenInvalidError):
+        # when
+        service.read_project_changes(uuid4(), 3, token, author="Bob")
+
+
+def test_read_project_changes_raises_error_for_invalid_kind():
+    # then
+    with pytest.raises(ChangeKindInvalidError):
+        # when
+        service.read_project_changes(uuid4(), 3, None, kind="new")